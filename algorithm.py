@@ -1,3 +1,11 @@
+import math
+import random
+import itertools
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него пути проверяются по одному
+    np = None
+
 def aabb_collision(rect1, rect2):
     '''
     Если все четыре условия выполняются, значит, 
@@ -8,4 +16,228 @@ def aabb_collision(rect1, rect2):
     return (rect1.x < rect2.x + rect2.width and
             rect1.x + rect1.width > rect2.x and
             rect1.y < rect2.y + rect2.height and
-            rect1.y + rect1.height > rect2.y)
\ No newline at end of file
+            rect1.y + rect1.height > rect2.y)
+
+def swept_aabb(rect, dx, dy, target):
+    '''
+    Непрерывная проверка: rect за шаг смещается на (dx, dy), target стоит
+    на месте. Возвращает долю шага в [0, 1], на которой прямоугольники
+    начинают пересекаться, или None, если за шаг они не встретятся.
+    Каждая ось задает интервал времени, когда проекции перекрываются;
+    столкновение есть, если интервалы осей пересекаются
+    '''
+    if aabb_collision(rect, target):
+        return 0.0
+    t_enter, t_exit = 0.0, 1.0
+    for start, size, delta, target_start, target_size in (
+            (rect.x, rect.width, dx, target.x, target.width),
+            (rect.y, rect.height, dy, target.y, target.height)):
+        # Проекции перекрываются, пока start лежит строго внутри (low, high)
+        low = target_start - size
+        high = target_start + target_size
+        if delta == 0:
+            if not low < start < high:
+                return None
+            continue
+        t0 = (low - start) / delta
+        t1 = (high - start) / delta
+        if t0 > t1:
+            t0, t1 = t1, t0
+        t_enter = max(t_enter, t0)
+        t_exit = min(t_exit, t1)
+        if t_enter >= t_exit:
+            return None
+    return t_enter
+
+class SpatialHash:
+    '''
+    Равномерная сетка для широкой фазы проверки столкновений.
+    Объект попадает во все ячейки, которые пересекает его прямоугольник,
+    поэтому запрос проверяет только соседей, а не весь список объектов
+    '''
+    BATCH_MIN_SWEEPS = 32
+    def __init__(self, cell_size=128):
+        self._cell_size = cell_size
+        self._cells = {}
+        self._item_cells = {}
+
+    @property
+    def cell_size(self):
+        return self._cell_size
+
+    def __len__(self):
+        return len(self._item_cells)
+
+    def _cell_keys(self, rect):
+        ''' Ключи ячеек, которые пересекает прямоугольник '''
+        size = self._cell_size
+        x0, y0 = int(rect.x // size), int(rect.y // size)
+        x1 = int((rect.x + rect.width - 1) // size)
+        y1 = int((rect.y + rect.height - 1) // size)
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def clear(self):
+        ''' Удаляет все объекты из сетки '''
+        self._cells.clear()
+        self._item_cells.clear()
+
+    def insert(self, item, rect):
+        ''' Добавляет объект с его прямоугольником в сетку '''
+        keys = self._cell_keys(rect)
+        for key in keys:
+            self._cells.setdefault(key, []).append((item, rect))
+        self._item_cells[item] = keys
+
+    def remove(self, item):
+        ''' Удаляет объект из всех ячеек, в которые он был добавлен '''
+        keys = self._item_cells.pop(item, ())
+        for key in keys:
+            bucket = self._cells[key]
+            bucket[:] = [entry for entry in bucket if entry[0] is not item]
+            if not bucket:
+                del self._cells[key]
+
+    def sweep(self, rect, dx, dy):
+        '''
+        Первый объект на пути rect при смещении на (dx, dy): пара
+        (время столкновения в долях шага, объект) или None
+        '''
+        bounds = rect.union(rect.move(dx, dy))
+        best = None
+        seen = set()
+        for key in self._cell_keys(bounds):
+            for item, item_rect in self._cells.get(key, ()):
+                if item in seen:
+                    continue
+                seen.add(item)
+                toi = swept_aabb(rect, dx, dy, item_rect)
+                if toi is not None and (best is None or toi < best[0]):
+                    best = (toi, item)
+        return best
+
+    def sweep_many(self, sweeps):
+        '''
+        Пакетная проверка путей: для каждого (rect, dx, dy) результат sweep.
+        Кандидаты всех путей собираются из сетки в общие массивы, и времена
+        входа и выхода по осям считаются над ними NumPy за один проход;
+        результат совпадает с sweep. Без NumPy или при малом числе путей
+        (накладные расходы массивов больше выигрыша) пути проверяются по одному
+        '''
+        if np is None or len(sweeps) < self.BATCH_MIN_SWEEPS:
+            return [self.sweep(rect, dx, dy) for rect, dx, dy in sweeps]
+        # Объект из нескольких ячеек попадает в кандидаты пути повторно; у повторов то же время,
+        # а выбирается первый найденный, поэтому отсеивать их не нужно
+        owners, entries = [], []
+        cells = self._cells
+        for index, (rect, dx, dy) in enumerate(sweeps):
+            for key in self._cell_keys(rect.union(rect.move(dx, dy))):
+                bucket = cells.get(key)
+                if bucket:
+                    owners.extend([index] * len(bucket))
+                    entries.extend(bucket)
+        result = [None] * len(sweeps)
+        if not owners:
+            return result
+        owner = np.array(owners)
+        paths = np.array([(rect.x, rect.y, rect.width, rect.height, dx, dy)
+                          for rect, dx, dy in sweeps], dtype=np.int64)[owner]
+        targets = np.fromiter(itertools.chain.from_iterable(item_rect for item, item_rect in entries),
+                              np.int64, 4 * len(entries)).reshape(-1, 4)
+        overlap = np.ones(len(owner), dtype=bool)
+        passes = np.ones(len(owner), dtype=bool)
+        t_enter = np.zeros(len(owner))
+        t_exit = np.ones(len(owner))
+        # Те же формулы, что в swept_aabb, для всех пар (путь, кандидат) сразу
+        for axis in (0, 1):
+            start, size, delta = paths[:, axis], paths[:, axis + 2], paths[:, axis + 4]
+            low = targets[:, axis] - size
+            high = targets[:, axis] + targets[:, axis + 2]
+            inside = (low < start) & (start < high)
+            overlap &= inside
+            still = delta == 0
+            passes &= inside | ~still
+            moving = np.where(still, 1, delta)
+            t0 = (low - start) / moving
+            t1 = (high - start) / moving
+            t_enter = np.where(still, t_enter, np.maximum(t_enter, np.minimum(t0, t1)))
+            t_exit = np.where(still, t_exit, np.minimum(t_exit, np.maximum(t0, t1)))
+        hit = overlap | (passes & (t_enter < t_exit))
+        toi = np.where(overlap, 0.0, t_enter)
+        # Ближайший кандидат каждого пути; при равном времени - первый найденный, как в sweep
+        pair = np.flatnonzero(hit)
+        pair = pair[np.lexsort((pair, toi[pair], owner[pair]))]
+        first = np.unique(owner[pair], return_index=True)[1]
+        for index, time in zip(pair[first].tolist(), toi[pair[first]].tolist()):
+            result[owners[index]] = (time, entries[index][0])
+        return result
+
+    def first_collision(self, rect):
+        ''' Возвращает первый объект, пересекающийся с rect, или None '''
+        for key in self._cell_keys(rect):
+            for item, item_rect in self._cells.get(key, ()):
+                if aabb_collision(rect, item_rect):
+                    return item
+        return None
+
+
+def poisson_disk_sample(width, height, min_distance, attempts=30, exclusion=None, rng=random):
+    '''
+    Выборка точек диска Пуассона (алгоритм Бридсона) в прямоугольнике
+    [0, width] x [0, height]: любые две точки не ближе min_distance.
+    Фоновая сетка с ячейкой min_distance / sqrt(2) хранит не больше одной
+    точки, поэтому проверка соседей занимает O(1), а вся выборка - не
+    больше attempts попыток на точку. exclusion = (x, y, radius) - круг,
+    в который точки не попадают. Возвращает точки в случайном порядке
+    '''
+    cell_size = min_distance / math.sqrt(2)
+    cols = int(width // cell_size) + 1
+    rows = int(height // cell_size) + 1
+    grid = [None] * (cols * rows)
+    min_distance_sq = min_distance * min_distance
+
+    def fits(x, y):
+        if not (0 <= x <= width and 0 <= y <= height):
+            return False
+        if exclusion is not None:
+            ex, ey, radius = exclusion
+            if (x - ex) ** 2 + (y - ey) ** 2 < radius * radius:
+                return False
+        col, row = int(x // cell_size), int(y // cell_size)
+        for r in range(max(0, row - 2), min(rows, row + 3)):
+            for c in range(max(0, col - 2), min(cols, col + 3)):
+                point = grid[r * cols + c]
+                if point is not None and (point[0] - x) ** 2 + (point[1] - y) ** 2 < min_distance_sq:
+                    return False
+        return True
+
+    points = []
+    active = []
+
+    def add(x, y):
+        grid[int(y // cell_size) * cols + int(x // cell_size)] = (x, y)
+        points.append((x, y))
+        active.append((x, y))
+
+    for _ in range(attempts):
+        x, y = rng.uniform(0, width), rng.uniform(0, height)
+        if fits(x, y):
+            add(x, y)
+            break
+
+    while active:
+        index = rng.randrange(len(active))
+        ax, ay = active[index]
+        for _ in range(attempts):
+            angle = rng.uniform(0, 2 * math.pi)
+            radius = rng.uniform(min_distance, 2 * min_distance)
+            x, y = ax + radius * math.cos(angle), ay + radius * math.sin(angle)
+            if fits(x, y):
+                add(x, y)
+                break
+        else:
+            # Вокруг точки места не осталось: убираем ее из активных (swap-remove)
+            active[index] = active[-1]
+            active.pop()
+
+    rng.shuffle(points)
+    return points
@@ -0,0 +1,84 @@
+from sprites import SpriteCache
+
+class Clip:
+    '''
+    Клип анимации: пути кадров, размер, скорость в кадрах в секунду и
+    зацикленность. Номер кадра - чистая функция от времени с начала клипа,
+    поэтому у объектов нет счетчиков кадров, а скорость не зависит от FPS
+    '''
+    __slots__ = ("_paths", "_size", "_fps", "_loop")
+
+    def __init__(self, paths, size, fps, loop=True):
+        self._paths = tuple(paths)
+        self._size = size
+        self._fps = fps
+        self._loop = loop
+
+    def __len__(self):
+        return len(self._paths)
+
+    @property
+    def paths(self):
+        return self._paths
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def fps(self):
+        return self._fps
+
+    @property
+    def loop(self):
+        return self._loop
+
+    @property
+    def duration(self):
+        ''' Длительность одного проигрывания в секундах '''
+        return len(self._paths) / self._fps
+
+    def index(self, elapsed):
+        ''' Номер кадра через elapsed секунд после начала клипа '''
+        frame = int(elapsed * self._fps)
+        if self._loop:
+            return frame % len(self._paths)
+        return max(0, min(frame, len(self._paths) - 1))
+
+class AnimationSet:
+    '''
+    Таблица кадров одного набора спрайтов (например, рыцаря): клипы по
+    именам и их кадры в обе стороны. Таблица общая для всех объектов
+    набора, объект хранит только время начала своего клипа (фазу).
+    После очистки кэша спрайтов кадры берутся из кэша заново
+    '''
+    def __init__(self, clips):
+        self._clips = clips
+        self._tables = {}
+        self._generation = None
+
+    def __contains__(self, name):
+        return name in self._clips
+
+    def clip(self, name):
+        return self._clips[name]
+
+    def load(self):
+        ''' Загружает кадры всех клипов; повторный вызов ничего не делает '''
+        if self._generation == SpriteCache.generation():
+            return
+        self._tables = {}
+        for name, clip in self._clips.items():
+            for flip in (False, True):
+                self._tables[name, flip] = SpriteCache.frames(clip.paths, clip.size, flip)
+        self._generation = SpriteCache.generation()
+
+    def frames(self, name, facing_left=False):
+        ''' Все кадры клипа в нужную сторону '''
+        self.load()
+        return self._tables[name, facing_left]
+
+    def frame(self, name, elapsed, facing_left=False):
+        ''' Кадр клипа name через elapsed секунд после его начала '''
+        self.load()
+        return self._tables[name, facing_left][self._clips[name].index(elapsed)]
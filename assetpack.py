@@ -0,0 +1,204 @@
+'''
+Пакет ресурсов: все спрайты игры, уже масштабированные до итогового
+размера (включая отраженные варианты), и тайлы фона в одном файле.
+Сборка выполняется заранее:
+
+    python assetpack.py [--output assets.pack]
+
+В игре файл отображается в память (mmap), а поверхности создаются через
+pygame.image.frombuffer прямо из отображения, без декодирования PNG/JPG.
+Если какой-то исходник в images/ новее пакета, пакет не используется
+'''
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+import subprocess
+import pygame
+
+_MAGIC = b"VSAP"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBI")  # магия, версия, длина индекса
+_ALIGN = 16
+
+def _data_start(index_size):
+    ''' Начало области пикселей: сразу после индекса, с выравниванием '''
+    start = _HEADER.size + index_size
+    return start + -start % _ALIGN
+
+def _read_index(data):
+    ''' (индекс, начало пикселей) из отображения; None, если формат другой или данных меньше, чем в индексе '''
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, index_size = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION or _data_start(index_size) > len(data):
+        return None
+    index = json.loads(bytes(data[_HEADER.size:_HEADER.size + index_size]))
+    data_start = _data_start(index_size)
+    pixels = len(data) - data_start
+    for offset, width, height, pixel_format in index["entries"].values():
+        if offset < 0 or offset + width * height * len(pixel_format) > pixels:
+            return None
+    return index, data_start
+
+def _is_fresh(index):
+    ''' Не изменился ли ни один исходник со времени сборки '''
+    for source, mtime in index["sources"].items():
+        try:
+            if os.stat(source).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+class AssetPack:
+    ''' Открытый пакет ресурсов: индекс и отображенные в память пиксели '''
+    def __init__(self, file, data, index, data_start):
+        self._file = file
+        self._data = data
+        self._view = memoryview(data)[data_start:]
+        self._entries = index["entries"]  # Ключ -> (смещение от начала пикселей, ширина, высота, формат)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @classmethod
+    def open(cls, path):
+        '''
+        Открывает пакет; None, если файла нет, он пустой или обрезан,
+        формат другой или исходники изменились
+        '''
+        try:
+            file = open(path, "rb")
+        except OSError:
+            return None
+        data = contents = None
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            contents = _read_index(data)
+        except (OSError, ValueError, KeyError, TypeError, struct.error):
+            # Пустой файл не отображается в память, испорченный индекс не разбирается
+            contents = None
+        if contents is None or not _is_fresh(contents[0]):
+            if data is not None:
+                data.close()
+            file.close()
+            return None
+        return cls(file, data, *contents)
+
+    def surface(self, key):
+        ''' Поверхность, которая ссылается на пиксели в отображенном файле '''
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        offset, width, height, pixel_format = entry
+        size = width * height * len(pixel_format)
+        return pygame.image.frombuffer(self._view[offset:offset + size], (width, height), pixel_format)
+
+def _collect_surfaces():
+    '''
+    Создает все объекты игры, которые загружают спрайты, и собирает
+    получившиеся поверхности по ключам пакета. Так список ресурсов
+    не расходится с кодом
+    '''
+    from sprites import SpriteCache, sprite_key
+    from player import Punk, Cyborg
+    from enemy import Knight, Skeleton, Demon
+    from obstacle import Rock, Tree
+    from fireball import Fireball
+    from hud import Hud
+    from background import TiledBackground, tile_key
+    from main import Game
+
+    # Шрифты нужны HUD; окно не создается, чтобы поверхности остались в исходном формате
+    pygame.init()
+    SpriteCache.use_pack(None)
+    for character in (Punk, Cyborg):
+        character(0, 0)
+        for direction in ("left", "right"):
+            Fireball(0, 0, direction, character.__name__)
+    for enemy in (Knight, Skeleton, Demon):
+        enemy(0, 0)
+    Rock(0, 0)
+    for tree_type in Tree._TREE_IMAGES:
+        Tree(0, 0, tree_type)
+    Hud(Game.WINDOW_WIDTH)
+    SpriteCache.get(Game.MENU_BACKGROUND, (Game.WINDOW_WIDTH, Game.WINDOW_HEIGHT))
+
+    surfaces = {sprite_key(*key): image for key, image in SpriteCache.images().items()}
+    sources = {key[0] for key in SpriteCache.images()}
+
+    background = TiledBackground(Game.BACKGROUND_IMAGE, Game.BACKGROUND_TEXTURE_SIZE,
+                                 (Game.MAP_WIDTH, Game.MAP_HEIGHT), (Game.WINDOW_WIDTH, Game.WINDOW_HEIGHT))
+    for col, row in background.texture_tiles():
+        key = tile_key(Game.BACKGROUND_IMAGE, Game.BACKGROUND_TEXTURE_SIZE, TiledBackground.TILE_SIZE, col, row)
+        surfaces[key] = background._build_tile(col, row)
+    sources.add(Game.BACKGROUND_IMAGE)
+    return surfaces, sources
+
+def build(output):
+    ''' Собирает пакет; возвращает число записанных поверхностей '''
+    surfaces, sources = _collect_surfaces()
+    entries = {}
+    blobs = []
+    offset = 0
+    for key, surface in sorted(surfaces.items()):
+        pixel_format = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+        blob = pygame.image.tobytes(surface, pixel_format)
+        padding = -len(blob) % _ALIGN
+        entries[key] = [offset, surface.get_width(), surface.get_height(), pixel_format]
+        blobs.append(blob + bytes(padding))
+        offset += len(blob) + padding
+    index = {
+        "entries": entries,
+        "sources": {source: os.stat(source).st_mtime_ns for source in sorted(sources)},
+    }
+    encoded = json.dumps(index, separators=(",", ":")).encode()
+    tmp_path = output + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, len(encoded)))
+        file.write(encoded)
+        file.write(bytes(_data_start(len(encoded)) - _HEADER.size - len(encoded)))
+        for blob in blobs:
+            file.write(blob)
+    os.replace(tmp_path, output)
+    return len(entries)
+
+def measure_first_frame(use_pack):
+    ''' Время до первого кадра меню в отдельном процессе, в миллисекундах '''
+    root = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, os.path.join(root, "main.py"), "--first-frame"]
+    if not use_pack:
+        command.append("--no-asset-pack")
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    # Пути к картинкам и пакету в игре относительные, поэтому процесс запускается из папки игры
+    output = subprocess.run(command, capture_output=True, text=True, env=env, check=True, cwd=root).stdout
+    for line in output.splitlines():
+        if line.startswith("first_menu_frame_ms:"):
+            return float(line.split(":")[1])
+    raise RuntimeError("main.py --first-frame не сообщил время первого кадра")
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Сборка пакета ресурсов")
+    parser.add_argument("--output", default="assets.pack")
+    parser.add_argument("--runs", type=int, default=3, help="число замеров времени до первого кадра меню")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = _parse_args()
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    start = time.perf_counter()
+    count = build(args.output)
+    print(f"{args.output}: {count} surfaces, {os.path.getsize(args.output) / 2 ** 20:.1f} MiB, "
+          f"built in {time.perf_counter() - start:.2f} s")
+    if args.runs > 0:
+        without_pack = min(measure_first_frame(False) for _ in range(args.runs))
+        with_pack = min(measure_first_frame(True) for _ in range(args.runs))
+        print(f"time to first menu frame: {without_pack:.1f} ms from images/, {with_pack:.1f} ms from pack")
+    pygame.quit()
@@ -0,0 +1,120 @@
+import math
+from collections import OrderedDict
+import pygame
+from sprites import SpriteCache
+
+def tile_key(image_path, texture_size, tile_size, col, row):
+    ''' Ключ тайла фона в пакете ресурсов '''
+    return f"{image_path}|{texture_size[0]}x{texture_size[1]}|tile{tile_size}:{col},{row}"
+
+class TiledBackground:
+    '''
+    Фон карты, нарезанный на квадратные тайлы. Исходное изображение
+    растягивается до размера текстуры (как раньше растягивалось на всю
+    карту), а на картах больше текстуры повторяется. Тайлы строятся из
+    исходника по требованию: в памяти держатся только тайлы вокруг камеры,
+    остальные вытесняются по LRU. Декодированный исходник и тайлы общие
+    для всего процесса, поэтому перезапуск игры их не пересоздает
+    '''
+    TILE_SIZE = 320
+    MARGIN_TILES = 1
+
+    _sources = {}
+    _tiles = OrderedDict()
+
+    def __init__(self, image_path, texture_size, map_size, view_size):
+        self._image_path = image_path
+        self._texture_width, self._texture_height = texture_size
+        self._map_width, self._map_height = map_size
+        self._texture_cols = math.ceil(self._texture_width / self.TILE_SIZE)
+        self._texture_rows = math.ceil(self._texture_height / self.TILE_SIZE)
+        view_cols = math.ceil(view_size[0] / self.TILE_SIZE) + 1 + 2 * self.MARGIN_TILES
+        view_rows = math.ceil(view_size[1] / self.TILE_SIZE) + 1 + 2 * self.MARGIN_TILES
+        # Больше тайлов, чем видно с запасом, держать незачем
+        self._max_resident = view_cols * view_rows
+
+    @classmethod
+    def resident_tiles(cls):
+        ''' Число тайлов, которые сейчас лежат в памяти '''
+        return len(cls._tiles)
+
+    def _source(self):
+        ''' Декодированное исходное изображение (один раз на процесс) '''
+        source = self._sources.get(self._image_path)
+        if source is None:
+            source = pygame.image.load(self._image_path)
+            if pygame.display.get_init() and pygame.display.get_surface() is not None:
+                source = source.convert()
+            self._sources[self._image_path] = source
+        return source
+
+    def _tile(self, col, row):
+        ''' Тайл текстуры; строится из исходника при первом обращении '''
+        key = (self._image_path, self._texture_width, self._texture_height,
+               col % self._texture_cols, row % self._texture_rows)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+        tile = self._build_tile(key[3], key[4])
+        self._tiles[key] = tile
+        return tile
+
+    def texture_tiles(self):
+        ''' Все (col, row) тайлов одного повторения текстуры '''
+        return [(col, row) for row in range(self._texture_rows) for col in range(self._texture_cols)]
+
+    def _build_tile(self, col, row):
+        ''' Масштабирует нужный кусок исходника в тайл текстуры (или берет готовый из пакета) '''
+        size = self.TILE_SIZE
+        packed = SpriteCache.packed(tile_key(self._image_path, (self._texture_width, self._texture_height),
+                                             size, col, row))
+        if packed is not None:
+            if pygame.display.get_init() and pygame.display.get_surface() is not None:
+                return packed.convert()
+            return packed
+        source = self._source()
+        scale_x = self._texture_width / source.get_width()
+        scale_y = self._texture_height / source.get_height()
+        left, top = col * size, row * size
+        src_x0 = int(left / scale_x)
+        src_y0 = int(top / scale_y)
+        src_x1 = min(source.get_width(), math.ceil((left + size) / scale_x) + 1)
+        src_y1 = min(source.get_height(), math.ceil((top + size) / scale_y) + 1)
+        piece = source.subsurface(pygame.Rect(src_x0, src_y0, src_x1 - src_x0, src_y1 - src_y0))
+        scaled = pygame.transform.scale(piece, (round((src_x1 - src_x0) * scale_x),
+                                                round((src_y1 - src_y0) * scale_y)))
+        tile = pygame.Surface((size, size))
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            tile = tile.convert()
+        tile.blit(scaled, (round(src_x0 * scale_x) - left, round(src_y0 * scale_y) - top))
+        return tile
+
+    def _tile_range(self, world_rect):
+        ''' Диапазоны колонок и строк тайлов, пересекающих прямоугольник мира '''
+        size = self.TILE_SIZE
+        return (range(world_rect.left // size, (world_rect.right - 1) // size + 1),
+                range(world_rect.top // size, (world_rect.bottom - 1) // size + 1))
+
+    def prepare(self, view):
+        ''' Подгружает тайлы вокруг камеры и вытесняет давно не нужные '''
+        margin = self.MARGIN_TILES * self.TILE_SIZE
+        cols, rows = self._tile_range(view.inflate(2 * margin, 2 * margin))
+        for row in rows:
+            for col in cols:
+                self._tile(col, row)
+        while len(self._tiles) > self._max_resident:
+            self._tiles.popitem(last=False)
+
+    def draw(self, screen, world_rect, dest=(0, 0)):
+        ''' Рисует часть мира world_rect в точку экрана dest '''
+        size = self.TILE_SIZE
+        offset_x = world_rect.x - dest[0]
+        offset_y = world_rect.y - dest[1]
+        previous_clip = screen.get_clip()
+        screen.set_clip(pygame.Rect(dest, world_rect.size).clip(previous_clip))
+        cols, rows = self._tile_range(world_rect)
+        for row in rows:
+            for col in cols:
+                screen.blit(self._tile(col, row), (col * size - offset_x, row * size - offset_y))
+        screen.set_clip(previous_clip)
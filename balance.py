@@ -0,0 +1,119 @@
+'''
+Пакетный прогон игр без окна для настройки баланса Punk и Cyborg.
+Игры распределяются по процессам multiprocessing; у каждой игры свое
+зерно (base_seed + номер игры), поэтому результат не зависит от числа
+процессов. В конце печатается сводная таблица по персонажам:
+
+    python balance.py --games 2000 --seconds 120 --script evade
+'''
+import os
+import csv
+import time
+import argparse
+import statistics
+import multiprocessing
+
+SCRIPTS = ("kite", "idle", "evade")
+
+_game = None  # Игра процесса-исполнителя, переиспользуется между прогонами
+
+def _init_worker(vectorized):
+    ''' Создает игру один раз на процесс: загрузка спрайтов и pygame.init дорогие '''
+    global _game
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    # Иначе SDL перехватывает SIGTERM, и пул не может завершить процесс
+    os.environ["SDL_NO_SIGNAL_HANDLERS"] = "1"
+    from main import Game
+    # Без profile_csv профайлер не копит строки кадров, и память процесса
+    # не растет от игры к игре (а _start_game их и так сбрасывает)
+    _game = Game(headless=True, vectorized=vectorized, profile_csv=None)
+
+def _input_script(name, game):
+    from simulation import idle_script, kite_script, EvadeController
+    if name == "idle":
+        return idle_script
+    if name == "evade":
+        return EvadeController(game)
+    return kite_script
+
+def run_game(job):
+    ''' Одна игра: job = (номер, персонаж, зерно, секунды, сценарий ввода) '''
+    index, character, seed, seconds, script = job
+    game = _game
+    game._seed = seed
+    game._menu._selected_character = character
+    game._start_game()
+    start_hp = game._player.hp
+    summary = game.simulate(seconds, _input_script(script, game))
+    return {
+        "game": index,
+        "character": character,
+        "seed": seed,
+        "survival_seconds": summary["simulated_seconds"],
+        "survived": not summary["game_over"],
+        "kills": summary["defeated_enemies"],
+        "damage_taken": start_hp - summary["player_hp"],
+        "tick_ms": summary["wall_seconds"] / max(1, summary["ticks"]) * 1000,
+    }
+
+def summarize(results):
+    ''' Сводка по персонажам: средние и медианы по всем играм '''
+    table = {}
+    for character in sorted({row["character"] for row in results}):
+        rows = [row for row in results if row["character"] == character]
+        survival = [row["survival_seconds"] for row in rows]
+        table[character] = {
+            "games": len(rows),
+            "survival_mean": statistics.fmean(survival),
+            "survival_median": statistics.median(survival),
+            "survived_rate": sum(row["survived"] for row in rows) / len(rows),
+            "kills_mean": statistics.fmean(row["kills"] for row in rows),
+            "damage_mean": statistics.fmean(row["damage_taken"] for row in rows),
+            "tick_ms_mean": statistics.fmean(row["tick_ms"] for row in rows),
+        }
+    return table
+
+def print_summary(table):
+    columns = ["games", "survival_mean", "survival_median", "survived_rate", "kills_mean",
+               "damage_mean", "tick_ms_mean"]
+    print(f"{'character':<10}" + "".join(f"{column:>17}" for column in columns))
+    for character, row in table.items():
+        cells = "".join(f"{row[column]:>17.3f}" if isinstance(row[column], float) else f"{row[column]:>17}"
+                        for column in columns)
+        print(f"{character:<10}{cells}")
+
+def run_batch(games, seconds, characters=("Punk", "Cyborg"), script="kite", base_seed=0,
+              workers=None, vectorized=False):
+    ''' Прогоняет games игр на каждого персонажа и возвращает строки результатов '''
+    jobs = [(index, character, base_seed + index, seconds, script)
+            for index in range(games) for character in characters]
+    # Одинаковые зерна у персонажей: они играют на одних и тех же картах
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(vectorized,)) as pool:
+        return pool.map(run_game, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count()))))
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Пакетные прогоны для баланса персонажей")
+    parser.add_argument("--games", type=int, default=100, help="число игр на каждого персонажа")
+    parser.add_argument("--seconds", type=float, default=120, help="максимальная длительность игры")
+    parser.add_argument("--characters", nargs="+", choices=["Punk", "Cyborg"], default=["Punk", "Cyborg"])
+    parser.add_argument("--script", choices=SCRIPTS, default="kite", help="сценарий ввода")
+    parser.add_argument("--seed", type=int, default=0, help="зерно первой игры")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию по числу ядер)")
+    parser.add_argument("--vectorized", action="store_true", help="пакетное обновление врагов через NumPy")
+    parser.add_argument("--csv", default=None, help="файл для построчных результатов игр")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = _parse_args()
+    wall_start = time.perf_counter()
+    results = run_batch(args.games, args.seconds, args.characters, args.script, args.seed,
+                        args.workers, args.vectorized)
+    wall_time = time.perf_counter() - wall_start
+    if args.csv:
+        with open(args.csv, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+    print_summary(summarize(results))
+    print(f"\n{len(results)} games in {wall_time:.1f} s")
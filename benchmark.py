@@ -0,0 +1,304 @@
+'''
+Набор замеров горячих путей симуляции и отрисовки. Работает без окна
+(драйвер SDL dummy), печатает таблицу и сохраняет результаты в JSON.
+С --baseline сравнивает медианы с сохраненным прогоном и завершается
+с кодом 1, если хоть один замер медленнее базового больше чем на порог:
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --baseline baseline.json --threshold 0.2
+'''
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from algorithm import aabb_collision, SpatialHash
+from enemy import Knight, Skeleton, Demon
+from obstacle import Rock
+from simulation import kite_script
+
+SEED = 1234
+
+def measure(function, setup=None, repeat=15, number=1):
+    '''
+    Замер function: repeat серий по number вызовов, перед каждой серией
+    вызывается setup (не входит в замер). Возвращает время одного вызова в мс
+    '''
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter() - start) / number * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "repeat": repeat, "number": number}
+
+class BenchmarkSuite:
+    ''' Набор замеров над одной игрой без окна с фиксированным зерном '''
+    ENEMY_COUNTS = (10, 100, 500)
+    FIREBALL_COUNTS = (0, 32)
+    OBSTACLE_COUNTS = (10, 100)
+    SCENARIO_SECONDS = 60
+
+    def __init__(self, quick=False):
+        from main import Game
+        self._game_class = Game
+        self._repeat = 5 if quick else 15
+        self._scenario_seconds = 10 if quick else self.SCENARIO_SECONDS
+        self._scenario_repeat = 1 if quick else 3
+        self._results = {}
+
+    @property
+    def results(self):
+        return self._results
+
+    def _new_game(self, vectorized=False):
+        ''' Игра сразу в состоянии "playing" с фиксированным зерном и бессмертным игроком '''
+        game = self._game_class(character="Cyborg", seed=SEED, vectorized=vectorized)
+        game._start_game()
+        game._state = "playing"
+        game._player._hp = 10 ** 9
+        return game
+
+    def _populate(self, game, enemies):
+        ''' Доводит число врагов до enemies '''
+        rng = random.Random(SEED)
+        while len(game._enemies) < enemies:
+            if not game._spawn_enemy(rng.choice([Knight, Skeleton, Demon])):
+                break
+
+    def _launch_fireballs(self, game, count):
+        ''' Запускает count огненных шаров из случайных точек карты '''
+        rng = random.Random(SEED)
+        player = game._player
+        player.fireballs.clear()
+        for _ in range(count):
+            player.fireballs.spawn(rng.randint(0, game.MAP_WIDTH), rng.randint(0, game.MAP_HEIGHT),
+                                   rng.choice(["left", "right"]), type(player).__name__)
+
+    def run(self, names=None):
+        ''' Выполняет замеры, имя которых содержит одну из подстрок names '''
+        benchmarks = [
+            ("aabb_collision", self.bench_aabb_collision),
+            ("sweep_projectiles", self.bench_sweep_projectiles),
+            ("flow_field", self.bench_flow_field),
+            ("enemy_update", self.bench_enemy_update),
+            ("player_update_fireballs", self.bench_player_update_fireballs),
+            ("game_update_enemies", self.bench_game_update_enemies),
+            ("crowd_separation", self.bench_crowd_separation),
+            ("draw_frame", self.bench_draw_frame),
+            ("scenario", self.bench_scenarios),
+        ]
+        for name, benchmark in benchmarks:
+            if not names or any(part in name for part in names):
+                benchmark()
+        return self._results
+
+    def _record(self, name, result):
+        self._results[name] = result
+        print(f"{name:<60} {result['median_ms']:10.4f} ms", flush=True)
+
+    def bench_aabb_collision(self):
+        rng = random.Random(SEED)
+        rects = [pygame.Rect(rng.randint(0, 2000), rng.randint(0, 2000), 75, 75) for _ in range(1000)]
+        probe = pygame.Rect(1000, 1000, 75, 75)
+
+        def run():
+            for rect in rects:
+                aabb_collision(probe, rect)
+
+        self._record("aabb_collision[1000]", measure(run, repeat=self._repeat, number=10))
+
+    def bench_sweep_projectiles(self):
+        rng = random.Random(SEED)
+        grid = SpatialHash()
+        for index in range(500):
+            grid.insert(index, pygame.Rect(rng.randint(0, 2800), rng.randint(0, 1500), 75, 75))
+        for projectiles in (32, 300):
+            sweeps = [(pygame.Rect(rng.randint(0, 2800), rng.randint(0, 1500), 30, 30), rng.choice([-15, 15]), 0)
+                      for _ in range(projectiles)]
+            self._record(f"sweep_projectiles[single,projectiles={projectiles}]",
+                         measure(lambda: [grid.sweep(*sweep) for sweep in sweeps], repeat=self._repeat))
+            self._record(f"sweep_projectiles[batch,projectiles={projectiles}]",
+                         measure(lambda: grid.sweep_many(sweeps), repeat=self._repeat))
+
+    def bench_flow_field(self):
+        from pathfinding import FlowField
+        from spawner import SpawnSampler
+        game = self._game_class
+        view_size = (game.WINDOW_WIDTH, game.WINDOW_HEIGHT)
+        ring_width = SpawnSampler.ring_width_for(view_size)
+        reach = (view_size[0] // 2 + ring_width, view_size[1] // 2 + ring_width)
+        for scale in (1, 4, 16):
+            # Карта в scale раз больше по площади с той же плотностью камней; центр свободен
+            width, height = game.MAP_WIDTH * int(scale ** 0.5), game.MAP_HEIGHT * int(scale ** 0.5)
+            rng = random.Random(SEED)
+            center = pygame.Rect(width // 2 - 300, height // 2 - 300, 600, 600)
+            rocks = [Rock(rng.randint(0, width), rng.randint(0, height)) for _ in range(40 * scale)]
+            rocks = [rock for rock in rocks if not rock.rect.colliderect(center)]
+            for name, window in (("map", None), ("window", reach)):
+                field = FlowField(width, height, rocks, reach=window)
+                rows, cols = field.shape
+                targets = iter(range(10 ** 9))
+                self._record(f"flow_field[{name},area={scale}x]",
+                             measure(lambda: field._compute((cols // 2 + next(targets) % 2, rows // 2)),
+                                     repeat=self._repeat))
+
+    def bench_enemy_update(self):
+        game = self._new_game()
+        player = game._player
+        for enemies in self.ENEMY_COUNTS:
+            for obstacles in self.OBSTACLE_COUNTS:
+                rng = random.Random(SEED)
+                grid = SpatialHash()
+                for _ in range(obstacles):
+                    rock = Rock(rng.randint(0, game.MAP_WIDTH - 75), rng.randint(0, game.MAP_HEIGHT - 75))
+                    grid.insert(rock, rock.rect)
+                crowd = [Knight(rng.randint(0, game.MAP_WIDTH - 75), rng.randint(0, game.MAP_HEIGHT - 75))
+                         for _ in range(enemies)]
+
+                def run():
+                    for enemy in crowd:
+                        enemy.update(player.x, player.y, player, grid)
+
+                self._record(f"enemy_update[enemies={enemies},obstacles={obstacles}]",
+                             measure(run, repeat=self._repeat, number=5))
+
+    def bench_player_update_fireballs(self):
+        game = self._new_game()
+        player = game._player
+        for count in (8, 32, 128):
+            self._record(f"player_update_fireballs[fireballs={count}]",
+                         measure(lambda: player._update_fireballs(game.MAP_WIDTH, game.MAP_HEIGHT,
+                                                                 game._obstacle_grid),
+                                 setup=lambda: self._launch_fireballs(game, count), repeat=self._repeat))
+
+    def bench_game_update_enemies(self):
+        modes = [False, True] if self._vectorized_available() else [False]
+        for vectorized in modes:
+            game = self._new_game(vectorized)
+            for enemies in self.ENEMY_COUNTS:
+                self._populate(game, enemies)
+                # Враги не умирают, чтобы состав не менялся между сериями
+                for enemy in game._enemies:
+                    enemy._hp = 10 ** 9
+                    if enemy._store is not None:
+                        enemy._store.on_damage(enemy)
+                for fireballs in self.FIREBALL_COUNTS:
+                    def run():
+                        game._update_enemies()
+                        game._handle_fireball_hits()
+
+                    mode = "vectorized" if vectorized else "scalar"
+                    self._record(f"game_update_enemies[{mode},enemies={enemies},fireballs={fireballs}]",
+                                 measure(run, setup=lambda: self._launch_fireballs(game, fireballs),
+                                         repeat=self._repeat, number=1))
+
+    def bench_crowd_separation(self):
+        from crowd import CrowdSeparation
+        crowd = CrowdSeparation(self._game_class.MAP_WIDTH, self._game_class.MAP_HEIGHT)
+        rng = random.Random(SEED)
+        for enemies in (500, 2000):
+            xs = [rng.randint(0, crowd.max_x) for _ in range(enemies)]
+            ys = [rng.randint(0, crowd.max_y) for _ in range(enemies)]
+            self._record(f"crowd_separation[scalar,enemies={enemies}]",
+                         measure(lambda: crowd.displacements(xs, ys), repeat=self._repeat))
+            if self._vectorized_available():
+                import numpy as np
+                x, y = np.array(xs), np.array(ys)
+                self._record(f"crowd_separation[vectorized,enemies={enemies}]",
+                             measure(lambda: crowd.displacements_array(x, y), repeat=self._repeat))
+
+    def bench_draw_frame(self):
+        game = self._new_game()
+        for enemies in self.ENEMY_COUNTS:
+            self._populate(game, enemies)
+            game._renderer.invalidate()
+            self._record(f"draw_frame[enemies={enemies},full]",
+                         measure(game._draw_frame, setup=game._renderer.invalidate, repeat=self._repeat))
+            game._draw_frame()
+            self._record(f"draw_frame[enemies={enemies},dirty]",
+                         measure(game._draw_frame, repeat=self._repeat))
+
+    def bench_scenarios(self):
+        modes = [False, True] if self._vectorized_available() else [False]
+        for vectorized in modes:
+            samples = []
+            for _ in range(self._scenario_repeat):
+                game = self._new_game(vectorized)
+                summary = game.simulate(self._scenario_seconds, kite_script)
+                samples.append(summary["wall_seconds"] / summary["ticks"] * 1000)
+            mode = "vectorized" if vectorized else "scalar"
+            self._record(f"scenario[{mode},{self._scenario_seconds}s]", {
+                "median_ms": statistics.median(samples), "min_ms": min(samples),
+                "repeat": len(samples), "number": summary["ticks"],
+                "defeated_enemies": summary["defeated_enemies"],
+                "enemies": len(game._enemies),
+            })
+
+    @staticmethod
+    def _vectorized_available():
+        from enemy_store import EnemyStore
+        return EnemyStore.is_available()
+
+def compare(results, baseline, threshold):
+    ''' Сравнение с базовым прогоном; возвращает список замедлившихся замеров '''
+    regressions = []
+    print(f"\n{'benchmark':<60} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<60} {'-':>10} {result['median_ms']:10.4f}      new")
+            continue
+        change = result["median_ms"] / base["median_ms"] - 1 if base["median_ms"] > 0 else 0.0
+        marker = ""
+        if change > threshold:
+            regressions.append(name)
+            marker = "  REGRESSION"
+        print(f"{name:<60} {base['median_ms']:10.4f} {result['median_ms']:10.4f} {change:+8.1%}{marker}")
+    return regressions
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Замеры производительности Vampire Survivors")
+    parser.add_argument("--output", default="benchmark.json", help="файл для результатов в JSON")
+    parser.add_argument("--baseline", default=None, help="JSON базового прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимое замедление (0.2 = 20%%)")
+    parser.add_argument("--quick", action="store_true", help="меньше повторов и короткие сценарии")
+    parser.add_argument("names", nargs="*", help="подстроки имен замеров, которые нужно выполнить")
+    return parser.parse_args()
+
+def main():
+    args = _parse_args()
+    suite = BenchmarkSuite(quick=args.quick)
+    results = suite.run(args.names)
+    report = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "seed": SEED,
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    code = main()
+    pygame.quit()
+    sys.exit(code)
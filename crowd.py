@@ -0,0 +1,183 @@
+import math
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него раздвижение считается по одному врагу
+    np = None
+
+class CrowdSeparation:
+    '''
+    Раздвижение толпы врагов. Враги раскладываются по клеткам размером
+    RADIUS, и каждый смотрит только на соседние 3x3 клетки, причем из
+    каждой клетки берутся не больше K первых врагов, а из найденных -
+    K ближайших. Соседи ближе RADIUS отталкивают врага тем сильнее, чем
+    ближе стоят, а итоговый сдвиг за шаг не больше STRENGTH по каждой оси.
+    Обычный и пакетный (NumPy) расчеты дают одинаковые сдвиги, и apply()
+    берет пакетный, если NumPy установлен
+    '''
+    RADIUS = 60
+    STRENGTH = 2
+    K = 6
+    _OFFSETS = [(ox, oy) for oy in (-1, 0, 1) for ox in (-1, 0, 1)]
+    _OFFSET_X = [ox for ox, oy in _OFFSETS]
+    _OFFSET_Y = [oy for ox, oy in _OFFSETS]
+
+    def __init__(self, map_width, map_height, agent_size=75, radius=RADIUS, strength=STRENGTH, k=K):
+        self._radius = radius
+        self._strength = strength
+        self._k = k
+        self._max_x = map_width - agent_size
+        self._max_y = map_height - agent_size
+        self._cols = self._max_x // radius + 1
+        self._rows = self._max_y // radius + 1
+
+    @property
+    def max_x(self):
+        return self._max_x
+
+    @property
+    def max_y(self):
+        return self._max_y
+
+    def _cell(self, x, y):
+        return (min(self._rows - 1, max(0, y // self._radius)) * self._cols
+                + min(self._cols - 1, max(0, x // self._radius)))
+
+    def _step(self, push):
+        ''' Сдвиг по оси из суммарного отталкивания '''
+        return max(-self._strength, min(self._strength, round(push * self._strength)))
+
+    def _neighbours(self, cells):
+        ''' Кандидаты в соседи для каждой занятой клетки: до k первых врагов из каждой из 3x3 клеток '''
+        k, cols, rows = self._k, self._cols, self._rows
+        result = {}
+        for cell in cells:
+            cell_y, cell_x = divmod(cell, cols)
+            found = []
+            for ox, oy in self._OFFSETS:
+                ncx, ncy = cell_x + ox, cell_y + oy
+                if 0 <= ncx < cols and 0 <= ncy < rows:
+                    members = cells.get(ncy * cols + ncx)
+                    if members:
+                        found.extend(members[:k])
+            result[cell] = found
+        return result
+
+    def displacements(self, xs, ys):
+        ''' Сдвиги (dx, dy) для каждого врага по спискам координат левых верхних углов '''
+        radius, k = self._radius, self._k
+        limit = radius * radius
+        own = [self._cell(x, y) for x, y in zip(xs, ys)]
+        cells = {}
+        for index, cell in enumerate(own):
+            cells.setdefault(cell, []).append(index)
+        # Враги одной клетки смотрят на одних и тех же кандидатов, поэтому список строится раз на клетку
+        neighbours = self._neighbours(cells)
+        result = []
+        for index, (x, y) in enumerate(zip(xs, ys)):
+            near = []
+            for other in neighbours[own[index]]:
+                dx, dy = x - xs[other], y - ys[other]
+                squared = dx * dx + dy * dy
+                if squared < limit and other != index:
+                    near.append((squared, other, dx, dy))
+            if not near:
+                result.append((0, 0))
+                continue
+            near.sort()
+            push_x = push_y = 0.0
+            for squared, other, dx, dy in near[:k]:
+                distance = math.sqrt(squared)
+                weight = (radius - distance) / radius
+                if distance == 0:
+                    # Враги в одной точке расходятся по горизонтали в разные стороны
+                    push_x += (1.0 if index > other else -1.0) * weight
+                else:
+                    push_x += dx / distance * weight
+                    push_y += dy / distance * weight
+            result.append((self._step(push_x), self._step(push_y)))
+        return result
+
+    def apply(self, enemies, obstacles):
+        ''' Раздвигает врагов; сдвиг в препятствие отменяется, за край карты - обрезается '''
+        xs = [enemy._x for enemy in enemies]
+        ys = [enemy._y for enemy in enemies]
+        if np is not None:
+            step_x, step_y = self.displacements_array(np.array(xs), np.array(ys))
+            moves = zip(step_x.tolist(), step_y.tolist())
+        else:
+            moves = self.displacements(xs, ys)
+        for enemy, (dx, dy) in zip(enemies, moves):
+            if not dx and not dy:
+                continue
+            prev_x, prev_y = enemy._x, enemy._y
+            enemy._x = min(self._max_x, max(0, prev_x + dx))
+            enemy._y = min(self._max_y, max(0, prev_y + dy))
+            enemy._rect.topleft = (enemy._x, enemy._y)
+            if obstacles.first_collision(enemy._rect) is not None:
+                enemy._x, enemy._y = prev_x, prev_y
+                enemy._rect.topleft = (prev_x, prev_y)
+
+    def displacements_array(self, x, y):
+        ''' То же, что displacements, над массивами NumPy; возвращает массивы dx, dy '''
+        n = len(x)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        radius, k, cols, rows = self._radius, self._k, self._cols, self._rows
+        limit = radius * radius
+        x = x.astype(np.int64)
+        y = y.astype(np.int64)
+        cell_x = np.clip(x // radius, 0, cols - 1)
+        cell_y = np.clip(y // radius, 0, rows - 1)
+        cell = cell_y * cols + cell_x
+        order = np.argsort(cell, kind="stable")
+        all_cells = np.arange(cols * rows)
+        start = np.searchsorted(cell[order], all_cells, "left")
+        count = np.minimum(np.searchsorted(cell[order], all_cells, "right") - start, k)
+
+        # Пары (враг, кандидат): до k первых врагов из каждой из 9 соседних клеток.
+        # Только реальные пары, без дополнения пустыми местами до 9 * k на врага
+        neighbour_x = cell_x[:, None] + self._OFFSET_X
+        neighbour_y = cell_y[:, None] + self._OFFSET_Y
+        inside = (neighbour_x >= 0) & (neighbour_x < cols) & (neighbour_y >= 0) & (neighbour_y < rows)
+        neighbour_cell = np.where(inside, neighbour_y * cols + neighbour_x, 0)
+        taken = np.where(inside, count[neighbour_cell], 0).ravel()
+        pairs = taken.reshape(n, -1).sum(axis=1)
+        owner = np.repeat(np.arange(n), pairs)
+        first = np.repeat(start[neighbour_cell].ravel() - (np.cumsum(taken) - taken), taken)
+        other = order[first + np.arange(len(first))]
+        dx = np.repeat(x, pairs) - x[other]
+        dy = np.repeat(y, pairs) - y[other]
+        squared = dx * dx + dy * dy
+        keep = (squared < limit) & (other != owner)
+
+        # k ближайших с тем же порядком, что и sort() в обычном расчете: по врагу, расстоянию,
+        # затем по номеру соседа. Ключ целый, поэтому порядок точный, и из ключа
+        # восстанавливаются и враг, и сосед, и расстояние
+        key = np.sort(((owner * limit + squared) * n + other)[keep])
+        other = key % n
+        owner, squared = np.divmod(key // n, limit)
+        per_owner = np.bincount(owner, minlength=n)
+        rank = np.arange(len(key)) - (np.cumsum(per_owner) - per_owner)[owner]
+        near = rank < k
+        owner, other, squared, rank = owner[near], other[near], squared[near], rank[near]
+
+        distance = np.sqrt(squared.astype(np.float64))
+        weight = (radius - distance) / radius
+        coincident = distance == 0
+        safe = np.where(coincident, 1.0, distance)
+        unit_x = np.where(coincident, np.where(owner > other, 1.0, -1.0), (x[owner] - x[other]) / safe)
+        unit_y = np.where(coincident, 0.0, (y[owner] - y[other]) / safe)
+
+        # Вклады раскладываются в матрицу (враг x ранг соседа) и суммируются по столбцам
+        # по порядку, чтобы результат совпадал с обычным расчетом
+        push = np.zeros((2, n, k))
+        push[0, owner, rank] = unit_x * weight
+        push[1, owner, rank] = unit_y * weight
+        push_x = push[0, :, 0].copy()
+        push_y = push[1, :, 0].copy()
+        for j in range(1, k):
+            push_x += push[0, :, j]
+            push_y += push[1, :, j]
+        step_x = np.clip(np.rint(push_x * self._strength), -self._strength, self._strength).astype(np.int64)
+        step_y = np.clip(np.rint(push_y * self._strength), -self._strength, self._strength).astype(np.int64)
+        return step_x, step_y
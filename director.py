@@ -0,0 +1,91 @@
+import time
+import random
+from collections import deque
+
+class WaveDirector:
+    '''
+    Управление численностью врагов. Целевое население растет со временем
+    игры, а каждые WAVE_INTERVAL секунд поверх него приходит волна,
+    которая с каждым разом больше. Недостающие враги ставятся в очередь,
+    и за один шаг из нее создается не больше SPAWNS_PER_STEP врагов
+    (и, если задан, не дольше time_budget секунд), а живых врагов никогда
+    не бывает больше max_enemies. Так массовое появление растягивается на
+    несколько шагов и не дает провалов частоты кадров. Очередь вместе с
+    живыми врагами тоже не превышает max_enemies: часть волны, для которой
+    нет места, отбрасывается, а не копится
+    '''
+    MAX_ENEMIES = 150
+    GROWTH_PER_MINUTE = 10
+    WAVE_INTERVAL = 30
+    WAVE_SIZE = 6
+    WAVE_GROWTH = 4
+    SPAWNS_PER_STEP = 3
+
+    def __init__(self, enemy_types, max_enemies=MAX_ENEMIES, spawns_per_step=SPAWNS_PER_STEP,
+                 time_budget=None, rng=random):
+        self._enemy_types = list(enemy_types)
+        self._max_enemies = max_enemies
+        self._spawns_per_step = spawns_per_step
+        # Бюджет по времени делает результат зависимым от скорости машины, поэтому по умолчанию выключен
+        self._time_budget = time_budget
+        self._rng = rng
+        self._queue = deque()
+        self.reset(0)
+
+    @property
+    def queue_depth(self):
+        return len(self._queue)
+
+    @property
+    def wave(self):
+        return self._wave
+
+    @property
+    def target_population(self):
+        return self._target
+
+    @property
+    def max_enemies(self):
+        return self._max_enemies
+
+    def reset(self, initial_population):
+        ''' Начало новой игры с уже созданными initial_population врагами '''
+        self._queue.clear()
+        self._base_population = initial_population
+        self._target = initial_population
+        self._wave = 0
+        self._next_wave_time = self.WAVE_INTERVAL
+
+    def plan(self, elapsed_time, live_enemies):
+        ''' Пополняет очередь до целевого населения и добавляет волны по таймеру '''
+        self._target = min(self._max_enemies,
+                           self._base_population + int(self.GROWTH_PER_MINUTE * elapsed_time / 60))
+        while elapsed_time >= self._next_wave_time:
+            self._wave += 1
+            self._next_wave_time += self.WAVE_INTERVAL
+            self._enqueue(self.WAVE_SIZE + self.WAVE_GROWTH * (self._wave - 1), live_enemies)
+        self._enqueue(self._target - live_enemies - len(self._queue), live_enemies)
+
+    def _enqueue(self, count, live_enemies):
+        ''' Ставит в очередь count врагов случайных типов, пока есть место до max_enemies '''
+        count = min(count, self._max_enemies - live_enemies - len(self._queue))
+        for _ in range(count):
+            self._queue.append(self._rng.choice(self._enemy_types))
+
+    def drain(self, spawn, live_enemies):
+        '''
+        Создает врагов из очереди в пределах бюджета шага и лимита живых.
+        spawn(enemy_type) создает врага и возвращает False, если места нет.
+        Возвращает число созданных врагов
+        '''
+        limit = min(len(self._queue), self._spawns_per_step, self._max_enemies - live_enemies)
+        deadline = None if self._time_budget is None else time.perf_counter() + self._time_budget
+        spawned = 0
+        while spawned < limit:
+            if deadline is not None and spawned and time.perf_counter() >= deadline:
+                break
+            if not spawn(self._queue[0]):
+                break
+            self._queue.popleft()
+            spawned += 1
+        return spawned
@@ -1,8 +1,9 @@
 import pygame
 from abc import ABC, abstractmethod
-import time
 import random
-from algorithm import aabb_collision
+from animation import Clip, AnimationSet
+from game_clock import clock
+from scheduler import scheduler
 
 class Enemy(ABC):
     """ Абстрактный базовый класс для врагов """
@@ -11,27 +12,39 @@ class Enemy(ABC):
     BASE_MIN_HP = 30
     BASE_MAX_HP = 70
     BASE_ATTACK_POWER = 5
+    ATTACK_COOLDOWN = 1
+    HURT_DURATION = 1
+    RUN_FPS = 2.4
+    ANIMATIONS = None  # AnimationSet подкласса: клипы "run", "hurt" и, если есть, "attack" и "death"
 
-    def __init__(self, x, y, speed_coeff, hp_coeff, attack_power_coeff, image_paths, hurt_image_path=None):
+    def __init__(self, x, y, speed_coeff, hp_coeff, attack_power_coeff):
         self._x = x
         self._y = y
         self._speed = random.randint(int(self.BASE_MIN_SPEED * speed_coeff), int(self.BASE_MAX_SPEED * speed_coeff))
         self._hp = random.randint(int(self.BASE_MIN_HP * hp_coeff), int(self.BASE_MAX_HP * hp_coeff))
         self._attack_power = int(self.BASE_ATTACK_POWER * attack_power_coeff)
-        self._images_right = self._load_images(image_paths)
-        self._images_left = [pygame.transform.flip(image, True, False) for image in self._images_right]
-        self._current_sprite = 0
+        self.ANIMATIONS.load()
+        self._phase = clock.time - self._phase_offset(x, y)  # Начало клипа бега
         self._is_facing_left = False
         self._rect = pygame.Rect(self._x, self._y, 75, 75)
-        self._last_attack_time = 0
+        self._last_attack_time = float("-inf")
+        self._attack_ready = True  # Снова True по событию планировщика через ATTACK_COOLDOWN после атаки
         self._hurt = False
         self._hurt_start_time = 0
-        self._hurt_image_right = None
-        self._hurt_image_left = None
-        if hurt_image_path:
-            self._hurt_image_right = pygame.transform.scale(pygame.image.load(hurt_image_path), (75, 75))
-            self._hurt_image_left = pygame.transform.flip(self._hurt_image_right, True, False)
-            
+        self._hurt_timer = None
+        self._death_time = None
+        self._store = None  # EnemyStore, если враг обновляется пакетно
+        self._slot = None
+
+    def _phase_offset(self, x, y):
+        """
+        Сдвиг клипа бега в пределах одного проигрывания, выведенный из точки
+        появления: враги стартовой волны, созданные в один момент, шагают
+        вразнобой. Генератор случайных чисел не используется, чтобы не
+        менять последовательность игры и повторы записей
+        """
+        return (x * 7919 + y * 104729) % 1024 / 1024 * self.ANIMATIONS.clip("run").duration
+
     # Свойства для координат и характеристик игрока
     @property
     def x(self):
@@ -53,17 +66,31 @@ class Enemy(ABC):
     def attack_power(self):
         return self._attack_power
 
-    def _load_images(self, paths):
-        """ Загружает изображения врага для анимации """
-        return [pygame.transform.scale(pygame.image.load(path), (75, 75)) for path in paths]
+    @property
+    def rect(self):
+        return self._rect
 
-    def _update_position(self, player_x, player_y):
-        """ Обновляет позицию врага в направлении к игроку """
+    @property
+    def dying(self):
+        """ Проигрывается ли еще анимация смерти убитого врага """
+        if self._death_time is None or "death" not in self.ANIMATIONS:
+            return False
+        return clock.time - self._death_time < self.ANIMATIONS.clip("death").duration
+
+    def _update_position(self, player_x, player_y, flow_field=None):
+        """ Обновляет позицию врага в направлении к игроку (по полю направлений, если оно есть) """
         prev_x, prev_y = self._x, self._y
 
         distance = ((self._x - player_x) ** 2 + (self._y - player_y) ** 2) ** 0.5
-
-        if distance >= 30:
+        direction = flow_field.direction_at(self._x, self._y) if flow_field is not None else None
+
+        if distance >= 30 and direction is not None:
+            dx, dy = direction
+            self._x += dx * self._speed
+            self._y += dy * self._speed
+            if dx:
+                self._is_facing_left = dx < 0
+        elif distance >= 30:
             if abs(self._x - player_x) > abs(self._y - player_y):
                 if self._x < player_x:
                     self._x += self._speed
@@ -81,22 +108,26 @@ class Enemy(ABC):
         return prev_x, prev_y
 
     def _handle_collisions(self, obstacles):
-        """ Проверяет столкновение с пряпятствием """
-        for obstacle in obstacles:
-            if aabb_collision(self._rect, obstacle.rect):
-                return True
-        return False
+        """ Проверяет столкновение с пряпятствием через пространственную сетку препятствий """
+        return obstacles.first_collision(self._rect) is not None
 
     def _attack_player(self, player):
         """ Атакует игрока, если игрок находится в пределах атаки """
-        current_time = time.time()
-        if self._rect.colliderect(player._rect) and current_time - self._last_attack_time >= 1:
+        if self._attack_ready and self._rect.colliderect(player._rect):
             player.take_damage(self._attack_power)
-            self._last_attack_time = current_time
+            self._last_attack_time = clock.time
+            self._attack_ready = False
+            scheduler.schedule(self._last_attack_time, self.ATTACK_COOLDOWN, self._ready_attack)
+
+    def _ready_attack(self):
+        self._attack_ready = True
+
+    def _clear_hurt(self):
+        self._hurt = False
 
-    def update(self, player_x, player_y, player, obstacles):
+    def update(self, player_x, player_y, player, obstacles, flow_field=None):
         """ Обновление состояния врага """
-        prev_x, prev_y = self._update_position(player_x, player_y)
+        prev_x, prev_y = self._update_position(player_x, player_y, flow_field)
 
         if self._handle_collisions(obstacles):
             self._x, self._y = prev_x, prev_y
@@ -104,51 +135,86 @@ class Enemy(ABC):
 
         self._attack_player(player)
 
-        if self._hurt and time.time() - self._hurt_start_time > 1:
-            self._hurt = False
+    def sprite(self):
+        """ Текущий кадр анимации и его позиция на карте; кадр зависит только от игрового времени """
+        animations = self.ANIMATIONS
+        now = clock.time
+        if self._death_time is not None and "death" in animations:
+            name, start = "death", self._death_time
+        elif self._hurt:
+            name, start = "hurt", now
+        elif "attack" in animations and now - self._last_attack_time < animations.clip("attack").duration:
+            name, start = "attack", self._last_attack_time
+        else:
+            name, start = "run", self._phase
+        return animations.frame(name, now - start, self._is_facing_left), (self._x, self._y)
 
     def draw(self, screen, camera_x, camera_y):
-        """ Отрисовывает врага """
-        if self._hurt:
-            image = self._hurt_image_left if self._is_facing_left else self._hurt_image_right
-        else:
-            images = self._images_left if self._is_facing_left else self._images_right
-            image = images[int(self._current_sprite)]
-            self._current_sprite = (self._current_sprite + 0.08) % len(images)
-        screen.blit(image, (self._x - camera_x, self._y - camera_y))
+        """ Отрисовывает врага и возвращает измененную область экрана """
+        image, (x, y) = self.sprite()
+        return screen.blit(image, (x - camera_x, y - camera_y))
 
     def take_damage(self, damage):
         """ Наносит урон врагу и запускает анимацию получения урона """
         self._hp = max(0, self._hp - damage)
         self._hurt = True
-        self._hurt_start_time = time.time()
+        self._hurt_start_time = clock.time
+        if self._hurt_timer is not None:
+            scheduler.cancel(self._hurt_timer)
+        self._hurt_timer = scheduler.schedule(self._hurt_start_time, self.HURT_DURATION, self._clear_hurt, strict=True)
+        if self._store is not None:
+            self._store.on_damage(self)
+
+    def die(self):
+        """ Отмечает момент смерти; с него начинается анимация смерти, если она есть """
+        self._death_time = clock.time
+
+def _clips(run_paths, hurt_path, run_fps=Enemy.RUN_FPS, **extra):
+    """ Клипы врага размером 75x75: бег, получение урона и дополнительные клипы """
+    clips = {
+        "run": Clip(run_paths, (75, 75), run_fps),
+        "hurt": Clip([hurt_path], (75, 75), 1),
+    }
+    clips.update(extra)
+    return AnimationSet(clips)
 
 class Knight(Enemy):
     """ Класс для врага рыцарь"""
+    ANIMATIONS = _clips(
+        [f"images/enemies/Knight/Run/Knight_Run_{i}.png" for i in range(1, 9)],
+        "images/enemies/Knight/Hurt/Knight_hurt.png",
+        attack=Clip([f"images/enemies/Knight/Attack/KnightAttack_{i}.png" for i in range(1, 6)], (75, 75), 10, loop=False),
+        death=Clip([f"images/enemies/Knight/Death/KnightDeath_{i}.png" for i in range(1, 6)], (75, 75), 8, loop=False),
+    )
+
     def __init__(self, x, y):
         speed_coeff = random.uniform(1, 1.2)
         hp_coeff = random.uniform(1, 1.5)
         attack_power_coeff = random.uniform(1.3, 1.6)
-        image_paths = [f"images/enemies/Knight/Run/Knight_Run_{i}.png" for i in range(1, 9)]
-        hurt_image_path = "images/enemies/Knight/Hurt/Knight_hurt.png"
-        super().__init__(x, y, speed_coeff, hp_coeff, attack_power_coeff, image_paths, hurt_image_path)
+        super().__init__(x, y, speed_coeff, hp_coeff, attack_power_coeff)
 
 class Skeleton(Enemy):
     """ Класс для врага скелета """
+    ANIMATIONS = _clips(
+        [f"images/enemies/Skeleton/Run/Skeleton_Run_{i}.png" for i in range(1, 13)],
+        "images/enemies/Skeleton/Hurt/Skeleton_Hurt.png",
+    )
+
     def __init__(self, x, y):
         speed_coeff = random.uniform(1.1, 1.4)
         hp_coeff = random.uniform(1.1, 1.3)
         attack_power_coeff = random.uniform(1.2, 1.5)
-        image_paths = [f"images/enemies/Skeleton/Run/Skeleton_Run_{i}.png" for i in range(1, 13)]
-        hurt_image_path = "images/enemies/Skeleton/Hurt/Skeleton_Hurt.png"
-        super().__init__(x, y, speed_coeff, hp_coeff, attack_power_coeff, image_paths, hurt_image_path)
+        super().__init__(x, y, speed_coeff, hp_coeff, attack_power_coeff)
 
 class Demon(Enemy):
     """ Класс для врага демона """
+    ANIMATIONS = _clips(
+        [f"images/enemies/Demon/Run/Demon_Run_{i}.png" for i in range(1, 9)],
+        "images/enemies/Demon/Hurt/Demon_Hurt.png",
+    )
+
     def __init__(self, x, y):
         speed_coeff = random.uniform(1.2, 1.5)
         hp_coeff = random.uniform(1, 1.5)
         attack_power_coeff = random.uniform(1, 1.5)
-        image_paths = [f"images/enemies/Demon/Run/Demon_Run_{i}.png" for i in range(1, 9)]
-        hurt_image_path = "images/enemies/Demon/Hurt/Demon_Hurt.png"
-        super().__init__(x, y, speed_coeff, hp_coeff, attack_power_coeff, image_paths, hurt_image_path)
+        super().__init__(x, y, speed_coeff, hp_coeff, attack_power_coeff)
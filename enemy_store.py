@@ -0,0 +1,219 @@
+from enemy import Enemy
+from scheduler import expired
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него враги обновляются по одному
+    np = None
+
+class EnemyStore:
+    '''
+    Хранилище врагов в виде структуры массивов (позиции, скорости, здоровье,
+    кулдауны). Движение, преследование игрока, откат при столкновении с
+    препятствием и проверка дальности атаки выполняются пакетно над
+    массивами NumPy. Объекты Enemy остаются тонкими представлениями:
+    после шага в них записываются координаты, направление и состояние
+    получения урона, поэтому отрисовка работает как раньше
+    '''
+    ATTACK_COOLDOWN = Enemy.ATTACK_COOLDOWN
+    HURT_DURATION = Enemy.HURT_DURATION
+    CHASE_DISTANCE = 30
+
+    def __init__(self, capacity=256):
+        if np is None:
+            raise RuntimeError("EnemyStore requires NumPy")
+        self._count = 0
+        self._enemies = []
+        self._allocate(capacity)
+        self._obstacles = np.zeros((0, 4), dtype=np.int64)
+        self._flow = None  # (поле, его версия, dir_x, dir_y, есть ли направление)
+
+    @staticmethod
+    def is_available():
+        ''' Доступен ли пакетный режим (установлен ли NumPy) '''
+        return np is not None
+
+    def _allocate(self, capacity):
+        ''' Выделяет (или расширяет) массивы под заданное число врагов '''
+        old = self._count
+        fields = {
+            "x": np.int64, "y": np.int64, "width": np.int64, "height": np.int64,
+            "speed": np.int64, "hp": np.int64, "attack_power": np.int64,
+            "last_attack": np.float64, "hurt_start": np.float64,
+            "hurt": np.bool_, "facing_left": np.bool_,
+        }
+        for name, dtype in fields.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if old:
+                array[:old] = getattr(self, name)[:old]
+            setattr(self, name, array)
+        self._capacity = capacity
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def enemies(self):
+        return self._enemies
+
+    def set_obstacles(self, obstacles):
+        ''' Запоминает прямоугольники препятствий в виде массива (x, y, w, h) '''
+        rects = [(o.rect.x, o.rect.y, o.rect.width, o.rect.height) for o in obstacles]
+        self._obstacles = np.array(rects, dtype=np.int64).reshape(-1, 4)
+
+    def add(self, enemy):
+        ''' Добавляет врага в хранилище и привязывает его к слоту '''
+        if self._count == self._capacity:
+            self._allocate(self._capacity * 2)
+        slot = self._count
+        self.x[slot], self.y[slot] = enemy._x, enemy._y
+        self.width[slot], self.height[slot] = enemy._rect.width, enemy._rect.height
+        self.speed[slot] = enemy._speed
+        self.hp[slot] = enemy._hp
+        self.attack_power[slot] = enemy._attack_power
+        self.last_attack[slot] = enemy._last_attack_time
+        self.hurt_start[slot] = enemy._hurt_start_time
+        self.hurt[slot] = enemy._hurt
+        self.facing_left[slot] = enemy._is_facing_left
+        enemy._store, enemy._slot = self, slot
+        self._enemies.append(enemy)
+        self._count += 1
+
+    def remove(self, enemy):
+        ''' Удаляет врага: на его место переносится последний слот '''
+        slot, last = enemy._slot, self._count - 1
+        if slot != last:
+            for name in ("x", "y", "width", "height", "speed", "hp", "attack_power",
+                         "last_attack", "hurt_start", "hurt", "facing_left"):
+                array = getattr(self, name)
+                array[slot] = array[last]
+            moved = self._enemies[last]
+            self._enemies[slot] = moved
+            moved._slot = slot
+        self._enemies.pop()
+        self._count -= 1
+        enemy._store, enemy._slot = None, None
+
+    def clear(self):
+        ''' Отвязывает всех врагов от хранилища '''
+        for enemy in self._enemies:
+            enemy._store, enemy._slot = None, None
+        self._enemies = []
+        self._count = 0
+
+    def on_damage(self, enemy):
+        ''' Переносит в массивы урон, полученный врагом вне пакетного шага '''
+        slot = enemy._slot
+        self.hp[slot] = enemy._hp
+        self.hurt[slot] = enemy._hurt
+        self.hurt_start[slot] = enemy._hurt_start_time
+
+    def _flow_arrays(self, flow_field):
+        '''
+        Массивы поля направлений. После очередного пересчета того же поля
+        переносятся только измененные клетки, иначе массивы строятся заново
+        '''
+        flow = self._flow
+        version = flow_field.version
+        if flow is not None and flow[0] is flow_field and flow[1] == version:
+            return flow[2:]
+        if flow is not None and flow[0] is flow_field and flow[1] == version - 1:
+            flow_x, flow_y, has_flow = flow[2:]
+            changed = flow_field.changed
+            cells = np.array(changed, dtype=np.int64)
+            dir_x, dir_y, distance = flow_field.dir_x, flow_field.dir_y, flow_field.distance
+            flow_x[cells] = [dir_x[cell] for cell in changed]
+            flow_y[cells] = [dir_y[cell] for cell in changed]
+            has_flow[cells] = [distance[cell] > 0 for cell in changed]
+        else:
+            flow_x = np.array(flow_field.dir_x, dtype=np.int64)
+            flow_y = np.array(flow_field.dir_y, dtype=np.int64)
+            has_flow = np.array(flow_field.distance) > 0
+        self._flow = (flow_field, version, flow_x, flow_y, has_flow)
+        return flow_x, flow_y, has_flow
+
+    def update(self, player, now, flow_field=None):
+        ''' Пакетный шаг всех врагов '''
+        n = self._count
+        if n == 0:
+            return
+        x, y, speed = self.x[:n], self.y[:n], self.speed[:n]
+        width, height = self.width[:n], self.height[:n]
+        facing_left = self.facing_left[:n]
+
+        # Преследование: шаг вдоль оси с большим расстоянием до игрока
+        dx = player.x - x
+        dy = player.y - y
+        moving = np.hypot(dx, dy) >= self.CHASE_DISTANCE
+        horizontal = np.abs(dx) > np.abs(dy)
+        step_x = np.where(dx > 0, speed, -speed)
+        step_y = np.where(dy > 0, speed, -speed)
+        if flow_field is not None:
+            # Где поле знает направление, враг идет по нему, иначе жадно к игроку
+            flow_x, flow_y, has_flow = self._flow_arrays(flow_field)
+            rows, cols = flow_field.shape
+            size = flow_field.cell_size
+            cell = np.clip(y // size, 0, rows - 1) * cols + np.clip(x // size, 0, cols - 1)
+            by_flow = moving & has_flow[cell]
+            step_x = np.where(by_flow, flow_x[cell] * speed, step_x)
+            step_y = np.where(by_flow, flow_y[cell] * speed, step_y)
+            horizontal = np.where(by_flow, flow_x[cell] != 0, horizontal)
+        move_x = moving & horizontal
+        move_y = moving & ~horizontal
+        new_x = x + np.where(move_x, step_x, 0)
+        new_y = y + np.where(move_y, step_y, 0)
+        facing_left[move_x] = step_x[move_x] < 0
+
+        # Откат тех, кто после шага пересекся с препятствием
+        blocked = self._blocked(new_x, new_y, width, height)
+        x[:] = np.where(blocked, x, new_x)
+        y[:] = np.where(blocked, y, new_y)
+
+        # Атака игрока в пределах его прямоугольника с учетом кулдауна.
+        # Сроки считаются тем же правилом expired, что и события планировщика в обычном режиме
+        rect = player._rect
+        in_range = ((x < rect.x + rect.width) & (x + width > rect.x) &
+                    (y < rect.y + rect.height) & (y + height > rect.y))
+        attackers = np.flatnonzero(in_range & expired(now, self.last_attack[:n], self.ATTACK_COOLDOWN))
+        for slot in attackers.tolist():
+            player.take_damage(int(self.attack_power[slot]))
+            self._enemies[slot]._last_attack_time = now  # Для клипа атаки при отрисовке
+        self.last_attack[attackers] = now
+
+        hurt = self.hurt[:n]
+        hurt &= ~expired(now, self.hurt_start[:n], self.HURT_DURATION, strict=True)
+
+        self._write_back(n)
+
+    def _blocked(self, x, y, width, height):
+        ''' Какие прямоугольники пересекаются хотя бы с одним препятствием '''
+        if not len(self._obstacles):
+            return np.zeros(len(x), dtype=np.bool_)
+        ox, oy, ow, oh = (self._obstacles[:, i] for i in range(4))
+        return ((x[:, None] < ox + ow) & (x[:, None] + width[:, None] > ox) &
+                (y[:, None] < oy + oh) & (y[:, None] + height[:, None] > oy)).any(axis=1)
+
+    def separate(self, crowd):
+        ''' Пакетное раздвижение толпы (CrowdSeparation) с откатом сдвигов в препятствия '''
+        n = self._count
+        if n == 0:
+            return
+        x, y = self.x[:n], self.y[:n]
+        width, height = self.width[:n], self.height[:n]
+        step_x, step_y = crowd.displacements_array(x, y)
+        moved = (step_x != 0) | (step_y != 0)
+        new_x = np.clip(x + step_x, 0, crowd.max_x)
+        new_y = np.clip(y + step_y, 0, crowd.max_y)
+        blocked = moved & self._blocked(new_x, new_y, width, height)
+        x[:] = np.where(blocked, x, new_x)
+        y[:] = np.where(blocked, y, new_y)
+        self._write_back(n)
+
+    def _write_back(self, n):
+        ''' Записывает результат шага в объекты врагов для отрисовки и столкновений '''
+        rows = zip(self._enemies, self.x[:n].tolist(), self.y[:n].tolist(),
+                   self.facing_left[:n].tolist(), self.hurt[:n].tolist())
+        for enemy, x, y, facing_left, hurt in rows:
+            enemy._x, enemy._y = x, y
+            enemy._rect.topleft = (x, y)
+            enemy._is_facing_left = facing_left
+            enemy._hurt = hurt
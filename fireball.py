@@ -1,52 +1,87 @@
 import pygame
+from animation import Clip, AnimationSet
+from game_clock import clock
+
+def _clips(base_path):
+    ''' Полет огненного шара: 4 кадра 40x40, 6 кадров в секунду '''
+    return AnimationSet({"fly": Clip([f"{base_path}{i}.png" for i in range(1, 5)], (40, 40), 6)})
 
 class Fireball:
     SPEED = 10
     MAX_DISTANCE = 500
+    ANIMATIONS = {
+        "Punk": _clips("images/hero/Punk/Weapon/Fireball_"),
+        "Cyborg": _clips("images/hero/Cyborg/Weapon/Fireball_"),
+    }
+
+    __slots__ = ("_start_x", "_x", "_y", "_prev_x", "_prev_y", "_direction", "character_type",
+                 "_animations", "_launch_time", "_rect", "_active", "_slot")
+
+    def __init__(self, x=0, y=0, direction="right", character_type=None):
+        self._rect = pygame.Rect(0, 0, 0, 0)
+        self._active = False
+        self._slot = None  # Индекс в списке активных снарядов пула
+        if character_type is not None:
+            self.launch(x, y, direction, character_type)
 
-    def __init__(self, x, y, direction, character_type):
+    def launch(self, x, y, direction, character_type):
+        ''' (Пере)запускает огненный шар; используется пулом вместо создания нового объекта '''
         self._start_x = x
         self._x = x
         self._y = y
+        self._prev_x, self._prev_y = x, y
         self._direction = direction
-        self.character_type = character_type  # Added character_type attribute
+        self.character_type = character_type
         self._load_images()
-        self._image_index = 0
-        self._rect = self._images[self._image_index].get_rect(center=(self._x, self._y))
+        self._launch_time = clock.time
+        self._rect.size = self._animations.frames("fly")[0].get_size()
+        self._rect.center = (self._x, self._y)
         self._active = True
 
     def _load_images(self):
-        ''' Определяем базовый путь в зависимости от типа персонажа '''
-        if self.character_type == "Punk":
-            base_path = "images/hero/Punk/Weapon/Fireball_"  
-        elif self.character_type == "Cyborg":
-            base_path = "images/hero/Cyborg/Weapon/Fireball_"  
-        else:
+        ''' Таблица кадров в зависимости от типа персонажа '''
+        animations = self.ANIMATIONS.get(self.character_type)
+        if animations is None:
             raise ValueError("Unknown character type")
-        
-        self._original_images = [pygame.transform.scale(pygame.image.load(f"{base_path}{i}.png"), (40, 40)) for i in range(1, 5)]
-        if self._direction == "left":
-            self._images = [pygame.transform.flip(image, True, False) for image in self._original_images]
-        else:
-            self._images = self._original_images
+        animations.load()
+        self._animations = animations
+
+    def _frame(self):
+        return self._animations.frame("fly", clock.time - self._launch_time, self._direction == "left")
 
     def update(self):
         ''' Обновляем положение огненного шара в зависимости от направления '''
+        self._prev_x, self._prev_y = self._x, self._y
         if self._direction == "right":
             self._x += self.SPEED
         else:
             self._x -= self.SPEED
         self._rect.topleft = (self._x, self._y)
-        self._image_index = (self._image_index + 0.2) % len(self._images)
-        
+
         if abs(self._x - self._start_x) > self.MAX_DISTANCE:
             self._active = False
 
+    def sprite(self):
+        ''' Текущий кадр огненного шара и его позиция на карте '''
+        return self._frame(), (self._x, self._y)
+
     def draw(self, screen, camera_x, camera_y):
-        ''' Отображаем огненный шар на экране '''
+        ''' Отображаем огненный шар на экране и возвращаем измененную область '''
         if self._active:
-            current_image = self._images[int(self._image_index)]
-            screen.blit(current_image, (self._x - camera_x, self._y - camera_y))
+            return screen.blit(self._frame(), (self._x - camera_x, self._y - camera_y))
+
+    @property
+    def sweep(self):
+        ''' Путь за последний шаг: (прямоугольник в начале шага, dx, dy) '''
+        dx, dy = self._x - self._prev_x, self._y - self._prev_y
+        return self._rect.move(-dx, -dy), dx, dy
+
+    def stop_at(self, toi):
+        ''' Останавливает шар в точке столкновения (доля toi пройденного за шаг пути) '''
+        self._x = self._prev_x + round((self._x - self._prev_x) * toi)
+        self._y = self._prev_y + round((self._y - self._prev_y) * toi)
+        self._rect.topleft = (self._x, self._y)
+        self._active = False
 
     @property
     def active(self):
@@ -54,4 +89,57 @@ class Fireball:
 
     @property
     def rect(self):
-        return self._rect
\ No newline at end of file
+        return self._rect
+
+class FireballPool:
+    '''
+    Пул огненных шаров. Объекты создаются заранее и переиспользуются
+    через список свободных; активные лежат плотным списком, а удаление
+    переставляет последний активный на место удаленного (O(1))
+    '''
+    def __init__(self, capacity=32):
+        self._active = []
+        self._free = [Fireball() for _ in range(capacity)]
+
+    def __len__(self):
+        return len(self._active)
+
+    def __iter__(self):
+        return iter(self._active)
+
+    def __getitem__(self, index):
+        return self._active[index]
+
+    @property
+    def active_count(self):
+        return len(self._active)
+
+    def spawn(self, x, y, direction, character_type):
+        ''' Берет свободный снаряд (или создает новый, если пул исчерпан) и запускает его '''
+        fireball = self._free.pop() if self._free else Fireball()
+        fireball.launch(x, y, direction, character_type)
+        fireball._slot = len(self._active)
+        self._active.append(fireball)
+        return fireball
+
+    def release(self, fireball):
+        '''
+        Возвращает снаряд в пул. На его место встает последний активный,
+        поэтому при удалении во время обхода список нужно обходить с конца
+        '''
+        slot = fireball._slot
+        last = self._active.pop()
+        if last is not fireball:
+            self._active[slot] = last
+            last._slot = slot
+        fireball._active = False
+        fireball._slot = None
+        self._free.append(fireball)
+
+    def clear(self):
+        ''' Возвращает в пул все активные снаряды '''
+        for fireball in self._active:
+            fireball._active = False
+            fireball._slot = None
+        self._free.extend(self._active)
+        self._active = []
@@ -0,0 +1,93 @@
+class GameClock:
+    '''
+    Игровые часы симуляции с фиксированным шагом. Реальное время кадра
+    складывается в накопитель, из которого симуляция забирает целые шаги,
+    поэтому при падении FPS игра догоняет время дополнительными шагами,
+    а не замедляется. На паузе время не идет, а остаток накопителя
+    (alpha) можно использовать для интерполяции при отрисовке
+    '''
+    def __init__(self, step=1 / 30, max_steps=5):
+        self._step = step
+        self._max_steps = max_steps
+        self._time = 0.0
+        self._ticks = 0
+        self._accumulator = 0.0
+        self._paused = False
+
+    @property
+    def time(self):
+        return self._time
+
+    @property
+    def step(self):
+        return self._step
+
+    @property
+    def ticks(self):
+        return self._ticks
+
+    @property
+    def paused(self):
+        return self._paused
+
+    @property
+    def alpha(self):
+        ''' Доля следующего шага, уже накопленная к моменту отрисовки (0..1) '''
+        if self._accumulator < 0:
+            # Шаг выполнен досрочно (borrow): показывается последнее состояние
+            return 1.0
+        return self._accumulator / self._step
+
+    def configure(self, step, max_steps=5):
+        ''' Задает длину шага и предел шагов догона за один кадр '''
+        self._step = step
+        self._max_steps = max_steps
+        self._accumulator = 0.0
+
+    def accumulate(self, frame_seconds):
+        '''
+        Добавляет реальное время кадра и возвращает число шагов симуляции,
+        которые нужно выполнить. Длинные кадры обрезаются до max_steps шагов,
+        чтобы медленная машина не уходила в бесконечный догон
+        '''
+        if self._paused:
+            return 0
+        self._accumulator += min(frame_seconds, self._step * self._max_steps)
+        steps = int(self._accumulator // self._step)
+        self._accumulator -= steps * self._step
+        return steps
+
+    def borrow(self):
+        '''
+        Разрешает один шаг досрочно, в счет времени следующего кадра:
+        накопитель уходит в минус, и средняя скорость игры не меняется.
+        Возвращает 1, если шаг разрешен, и 0, если досрочный шаг уже взят
+        '''
+        if self._paused or self._accumulator < 0:
+            return 0
+        self._accumulator -= self._step
+        return 1
+
+    def advance(self, seconds=None):
+        ''' Продвигает часы на один шаг (или на заданное число секунд) '''
+        self._time += self._step if seconds is None else seconds
+        self._ticks += 1
+
+    def pause(self):
+        ''' Останавливает время '''
+        self._paused = True
+
+    def resume(self):
+        ''' Возобновляет время; накопленное до паузы время отбрасывается '''
+        self._paused = False
+        self._accumulator = 0.0
+
+    def reset(self):
+        ''' Сбрасывает часы в ноль '''
+        self._time = 0.0
+        self._ticks = 0
+        self._accumulator = 0.0
+        self._paused = False
+
+# Общие часы для всех игровых объектов
+clock = GameClock()
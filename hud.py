@@ -0,0 +1,63 @@
+import pygame
+from sprites import SpriteCache
+
+class TextCache:
+    ''' Кэш отрисованных строк для одного шрифта: строка рендерится один раз '''
+    MAX_ENTRIES = 128
+
+    def __init__(self, font):
+        self._font = font
+        self._surfaces = {}
+
+    @property
+    def font(self):
+        return self._font
+
+    def render(self, text, color):
+        ''' Возвращает поверхность с текстом, отрисовывая ее только при первом запросе '''
+        key = (text, color)
+        surface = self._surfaces.get(key)
+        if surface is None:
+            if len(self._surfaces) >= self.MAX_ENTRIES:
+                self._surfaces.clear()
+            surface = self._font.render(text, True, color)
+            self._surfaces[key] = surface
+        return surface
+
+class Hud:
+    '''
+    Игровой интерфейс: таймер и счетчик побежденных врагов.
+    Шрифты и иконка создаются один раз, а текст перерисовывается
+    только когда меняется секунда таймера или число побед
+    '''
+    TEXT_COLOR = (255, 255, 255)
+    SKULL_PATH = "images/decor/Skull.png"
+
+    def __init__(self, window_width):
+        self._window_width = window_width
+        self._timer_text = TextCache(pygame.font.Font(None, 50))
+        self._counter_text = TextCache(pygame.font.Font(None, 36))
+        self._skull_image = SpriteCache.get(self.SKULL_PATH, (40, 40))
+        self._skull_rect = self._skull_image.get_rect(topright=(window_width - 10, 10))
+        self._shown_seconds = None
+        self._timer_surface = None
+        self._shown_defeated = None
+        self._counter_surface = None
+        self._counter_rect = None
+
+    def draw(self, screen, elapsed_time, defeated_enemies):
+        ''' Отрисовка таймера и счетчика побед; возвращает измененные области экрана '''
+        seconds = int(elapsed_time)
+        if seconds != self._shown_seconds:
+            self._shown_seconds = seconds
+            self._timer_surface = self._timer_text.render(f"{seconds // 60:02}:{seconds % 60:02}", self.TEXT_COLOR)
+        timer_rect = screen.blit(self._timer_surface, (screen.get_width() // 2 - 50, 20))
+
+        if defeated_enemies != self._shown_defeated:
+            self._shown_defeated = defeated_enemies
+            self._counter_surface = self._counter_text.render(str(defeated_enemies), self.TEXT_COLOR)
+            self._counter_rect = self._counter_surface.get_rect(
+                midright=(self._skull_rect.x - 5, self._skull_rect.centery))
+        skull_rect = screen.blit(self._skull_image, self._skull_rect)
+        counter_rect = screen.blit(self._counter_surface, self._counter_rect)
+        return [timer_rect, skull_rect, counter_rect]
@@ -0,0 +1,111 @@
+import time
+from collections import deque
+import pygame
+
+class InputSampler:
+    '''
+    Единая точка ввода игры. Пока цикл ждет следующего кадра, очередь
+    событий SDL опрашивается примерно раз в миллисекунду, и каждое событие
+    ввода получает время прихода. Пришедший ввод прерывает ожидание: кадр
+    с его результатом собирается сразу, а не после оставшегося сна.
+    Состояние клавиш снимается в poll() прямо перед шагами симуляции, а
+    после вывода кадра (presented) для событий считается задержка
+    "событие -> экран"
+    '''
+    TRIGGERS = (pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+    POLL_INTERVAL = 0.001
+    HISTORY = 1000
+
+    def __init__(self, fps):
+        self._period = 1 / fps
+        self._deadline = None
+        self._last_poll = None
+        self._frame_seconds = 0.0
+        self._events = []
+        self._keys = None
+        self._triggered = False
+        self._input_arrived = False
+        self._pending = []  # Время прихода событий, результат которых еще не выведен на экран
+        self._latencies = deque(maxlen=self.HISTORY)
+
+    @property
+    def keys(self):
+        ''' Состояние клавиш, снятое последним poll() '''
+        if self._keys is None:
+            return pygame.key.get_pressed()
+        return self._keys
+
+    @property
+    def frame_seconds(self):
+        ''' Реальное время между двумя последними poll() '''
+        return self._frame_seconds
+
+    @property
+    def input_arrived(self):
+        ''' Пришел ли ввод к последнему poll() '''
+        return self._input_arrived
+
+    def _collect(self):
+        ''' Забирает события из очереди SDL и отмечает время прихода ввода '''
+        events = pygame.event.get()
+        if not events:
+            return
+        now = time.perf_counter()
+        for event in events:
+            if event.type in self.TRIGGERS:
+                self._pending.append(now)
+                self._triggered = True
+        self._events.extend(events)
+
+    def wait(self):
+        ''' Ждет начала следующего кадра (вместо Clock.tick); ввод прерывает ожидание '''
+        now = time.perf_counter()
+        if self._deadline is None or now - self._deadline > self._period:
+            # Первый кадр или сильное отставание: расписание кадров начинается заново
+            self._deadline = now
+        while True:
+            self._collect()
+            if self._triggered:
+                # Кадр раньше срока; расписание не сдвигается, следующий кадр - в прежний срок
+                return
+            remaining = self._deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            time.sleep(min(self.POLL_INTERVAL, remaining))
+        self._deadline += self._period
+
+    def poll(self):
+        ''' События кадра; вызывается непосредственно перед шагами симуляции '''
+        self._collect()
+        now = time.perf_counter()
+        self._frame_seconds = 0.0 if self._last_poll is None else now - self._last_poll
+        self._last_poll = now
+        self._keys = pygame.key.get_pressed()
+        self._input_arrived, self._triggered = self._triggered, False
+        events, self._events = self._events, []
+        return events
+
+    def restart_frame(self):
+        '''
+        Начинает отсчет времени кадра заново: загрузка игры, меню и пауза
+        до этого момента не попадают в frame_seconds следующего poll()
+        '''
+        self._last_poll = time.perf_counter()
+
+    def presented(self):
+        ''' Кадр выведен на экран; возвращает число событий, для которых посчитана задержка '''
+        if not self._pending:
+            return 0
+        now = time.perf_counter()
+        self._latencies.extend(now - arrived for arrived in self._pending)
+        count = len(self._pending)
+        self._pending.clear()
+        return count
+
+    def percentiles(self, values=(50, 95, 99)):
+        ''' Перцентили задержки "событие -> экран" в миллисекундах по последним событиям '''
+        if not self._latencies:
+            return {p: 0.0 for p in values}
+        ordered = sorted(self._latencies)
+        last = len(ordered) - 1
+        return {p: ordered[min(last, int(round(p / 100 * last)))] * 1000 for p in values}
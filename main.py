@@ -1,23 +1,81 @@
-import pygame
+import os
 import sys
+import time
+
+# Отсчет для замера времени до первого кадра меню
+_PROCESS_START = time.perf_counter()
+
+import zlib
+import struct
 import random
+import argparse
+import pygame
 from player import Punk, Cyborg
 from obstacle import Rock, Tree
 from enemy import Knight, Skeleton, Demon
+from fireball import Fireball
 from menu import Menu, PauseMenu, GameOverMenu
+from algorithm import SpatialHash, poisson_disk_sample
+from game_clock import clock
+from scheduler import scheduler
+from input_sampler import InputSampler
+from enemy_store import EnemyStore
+from simulation import ScriptedKeys, kite_script
+from pathfinding import FlowField
+from crowd import CrowdSeparation
+from spawner import SpawnSampler
+from director import WaveDirector
+from preloader import Preloader
+from replay import InputLog, InputRecorder, EVENT_QUIT, EVENT_PAUSE, EVENT_TOGGLE_OVERLAY
+from background import TiledBackground
+from profiler import FrameProfiler
+from hud import Hud
+from renderer import Renderer
+from sprites import SpriteCache
+from assetpack import AssetPack
 
 class Game:
     WINDOW_WIDTH = 1440
     WINDOW_HEIGHT = 800
     MAP_WIDTH = 2880
     MAP_HEIGHT = 1600
+    # Размер, до которого растягивается текстура фона; большие карты ее повторяют
+    BACKGROUND_TEXTURE_SIZE = (2880, 1600)
+    BACKGROUND_IMAGE = "images/fon/fon_2.jpg"
+    MENU_BACKGROUND = "images/fon/Blood_moon.jpg"
+    # Пакет заранее подготовленных спрайтов (python assetpack.py); без него картинки грузятся из images/
+    ASSET_PACK = "assets.pack"
+    # Расстановка препятствий: количество, минимальное расстояние и свободная зона вокруг старта
+    ROCK_COUNT = 5
+    TREE_COUNT = 5
+    OBSTACLE_MIN_DISTANCE = 400
+    OBSTACLE_SPAWN_CLEARANCE = 150
     FPS = 30
 
-    def __init__(self):
+    def __init__(self, headless=False, character=None, seed=None, vectorized=False, profile_csv=None,
+                 interpolate=False, record=None, asset_pack=None):
+        self._headless = headless
+        self._interpolate = interpolate
+        clock.configure(1 / self.FPS)
+        self._profiler = FrameProfiler(keep_rows=profile_csv is not None)
+        self._profile_csv = profile_csv
+        # Пакетное обновление врагов через NumPy, если он установлен
+        self._enemy_store = EnemyStore() if vectorized and EnemyStore.is_available() else None
+        if headless:
+            # Без окна: SDL рисует в память, кадры не выводятся
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        # Запись ввода требует известного зерна, иначе сессию не повторить
+        self._recorder = InputRecorder(record) if record else None
+        if seed is None and record:
+            seed = random.randrange(2 ** 31)
+        self._seed = seed
+        if asset_pack:
+            SpriteCache.use_pack(AssetPack.open(asset_pack))
         pygame.init()
         self._screen = pygame.display.set_mode((self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
         pygame.display.set_caption("Vampire Survivors")
-        self._clock = pygame.time.Clock()
+        self._input = InputSampler(self.FPS)
         self._running = True
         self._state = "menu"
         self._defeated_enemies = 0
@@ -25,142 +83,200 @@ class Game:
         self._menu = Menu(self._screen, self.WINDOW_WIDTH, self.WINDOW_HEIGHT, self._background_image)
         self._pause_menu = PauseMenu(self._screen, self.WINDOW_WIDTH, self.WINDOW_HEIGHT, self._background_image)
         self._game_over_menu = GameOverMenu(self._screen, self.WINDOW_WIDTH, self.WINDOW_HEIGHT, self._background_image)
+        self._hud = Hud(self.WINDOW_WIDTH)
+        self._renderer = Renderer(self._screen)
+        self._director = WaveDirector([Knight, Skeleton, Demon])
         self._start_time = None
-        self._pause_start_time = None
-        self._total_paused_time = 0
-        self._start_game()  # Начало игры
+        self._elapsed_time = 0
+        self._menu._selected_character = character
+        self._player = None  # Игра начинается в _start_game: по кнопке меню или при первом прогоне
+        # Следующая игра готовится в фоне, пока показывается меню
+        self._preloader = Preloader(self._prepare_world)
+
+    def _prepare_world(self, report=None):
+        '''
+        Все, что не зависит от выбранного персонажа: фон, препятствия, сетки,
+        поле направлений и первые враги. Вызывается из фонового потока, пока
+        показывается меню: меню не трогает ни генератор случайных чисел,
+        ни игровые часы, поэтому мир получается тем же, что и без фона
+        '''
+        report = report or (lambda progress: None)
+        # Каждая игра начинается с одного и того же состояния генератора и часов
+        if self._seed is not None:
+            random.seed(self._seed)
+        clock.reset()
+        start_x, start_y = self.MAP_WIDTH // 2, self.MAP_HEIGHT // 2
+        background = None
+        if not self._headless:
+            background = self._load_background()
+            background.prepare(pygame.Rect(start_x - self.WINDOW_WIDTH // 2, start_y - self.WINDOW_HEIGHT // 2,
+                                           self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
+        report(0.4)
+        # Кадры всех персонажей, снарядов и врагов, чтобы первый выстрел или новый враг не грузил картинки
+        for animations in ([Punk.ANIMATIONS, Cyborg.ANIMATIONS] + list(Fireball.ANIMATIONS.values()) +
+                           [Knight.ANIMATIONS, Skeleton.ANIMATIONS, Demon.ANIMATIONS]):
+            animations.load()
+        report(0.6)
+        obstacles = self._create_obstacles()
+        obstacle_grid = SpatialHash()
+        for obstacle in obstacles:
+            obstacle_grid.insert(obstacle, obstacle.rect)
+        # Поле строится только вокруг игрока: на экране и в кольце появления врагов
+        view_size = (self.WINDOW_WIDTH, self.WINDOW_HEIGHT)
+        ring_width = SpawnSampler.ring_width_for(view_size)
+        flow_field = FlowField(self.MAP_WIDTH, self.MAP_HEIGHT, obstacles,
+                               reach=(view_size[0] // 2 + ring_width, view_size[1] // 2 + ring_width))
+        report(0.8)
+        spawn_sampler = SpawnSampler(self.MAP_WIDTH, self.MAP_HEIGHT, obstacles, view_size,
+                                     ring_width=ring_width)
+        enemies = self._create_enemies(spawn_sampler, start_x, start_y)
+        return {
+            "background": background,
+            "obstacles": obstacles,
+            "obstacle_grid": obstacle_grid,
+            "flow_field": flow_field,
+            "spawn_sampler": spawn_sampler,
+            "enemies": enemies,
+        }
 
     def _start_game(self):
-        ''' Инициализация объектов '''
+        ''' Начало игры: мир берется у фонового загрузчика или строится здесь же '''
+        world = self._preloader.take() if self._preloader.started else self._prepare_world()
+        scheduler.clear()
+        self._profiler.reset_rows()
         self._defeated_enemies = 0
-        self._background = self._load_background()
+        self._background = world["background"]
         if self._menu._selected_character == "Punk":
             self._player = Punk(self.MAP_WIDTH // 2, self.MAP_HEIGHT // 2)
         else:
             self._player = Cyborg(self.MAP_WIDTH // 2, self.MAP_HEIGHT // 2)
         self._camera_x = self._player.x - self.WINDOW_WIDTH // 2
         self._camera_y = self._player.y - self.WINDOW_HEIGHT // 2
-        self._obstacles = self._create_obstacles()
-        self._enemies = self._create_enemies()
-        self._start_time = pygame.time.get_ticks()
+        self._obstacles = world["obstacles"]
+        self._obstacle_grid = world["obstacle_grid"]
+        self._enemy_grid = SpatialHash()
+        self._flow_field = world["flow_field"]
+        self._crowd = CrowdSeparation(self.MAP_WIDTH, self.MAP_HEIGHT)
+        self._spawn_sampler = world["spawn_sampler"]
+        self._enemies = world["enemies"]
+        self._corpses = []  # Убитые враги, у которых еще идет анимация смерти
+        self._director.reset(len(self._enemies))
+        if self._enemy_store is not None:
+            self._enemy_store.clear()
+            self._enemy_store.set_obstacles(self._obstacles)
+            for enemy in self._enemies:
+                self._enemy_store.add(enemy)
+        self._start_time = clock.time
+        self._elapsed_time = 0
+        self._previous_view = (self._camera_x, self._camera_y, self._player.x, self._player.y)
+        self._previous_enemies = {}
+        if self._recorder is not None:
+            self._recorder.begin(self._seed, type(self._player).__name__, self.FPS)
 
     def _load_background_image(self):
         ''' Загрузка фонового изображения для меню '''
-        image = pygame.image.load("images/fon/Blood_moon.jpg")
-        return pygame.transform.scale(image, (self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
+        return SpriteCache.get(self.MENU_BACKGROUND, (self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
 
     def _load_background(self):
-        ''' Загрузка фонового изображения для игры '''
-        background = pygame.image.load("images/fon/fon_2.jpg")
-        return pygame.transform.scale(background, (self.MAP_WIDTH, self.MAP_HEIGHT))
+        ''' Фон игры из тайлов, которые подгружаются вокруг камеры '''
+        return TiledBackground(self.BACKGROUND_IMAGE, self.BACKGROUND_TEXTURE_SIZE,
+                               (self.MAP_WIDTH, self.MAP_HEIGHT), (self.WINDOW_WIDTH, self.WINDOW_HEIGHT))
 
     def _create_obstacles(self):
-        ''' Создание препятствий на карте '''
-        obstacles = []
-        player_x, player_y = self.MAP_WIDTH // 2, self.MAP_HEIGHT // 2
-        occupied_positions = set()
-        avoid_radius, min_distance = 100, 400
-
-        def is_valid_position(x, y):
-            ''' Проверка на допустимость позиции для размещения препятствия '''
-            if abs(x - player_x) < avoid_radius and abs(y - player_y) < avoid_radius:
-                return False
-            for ox, oy in occupied_positions:
-                if abs(x - ox) < min_distance and abs(y - oy) < min_distance:
-                    return False
-            return True
+        ''' Создание препятствий на карте выборкой диска Пуассона '''
+        needed = self.ROCK_COUNT + self.TREE_COUNT
+        spawn = (self.MAP_WIDTH // 2, self.MAP_HEIGHT // 2, self.OBSTACLE_SPAWN_CLEARANCE)
+        positions = poisson_disk_sample(self.MAP_WIDTH - 75, self.MAP_HEIGHT - 75,
+                                        self.OBSTACLE_MIN_DISTANCE, exclusion=spawn)
+        if len(positions) < needed:
+            raise RuntimeError(f"Не удалось разместить {needed} препятствий: на карте поместилось "
+                               f"только {len(positions)} при расстоянии {self.OBSTACLE_MIN_DISTANCE}")
+        positions = [(int(x), int(y)) for x, y in positions[:needed]]
 
         # Размещение камней
-        for _ in range(5):
-            x, y = self._get_random_position(is_valid_position)
-            occupied_positions.add((x, y))
-            obstacles.append(Rock(x, y))
+        obstacles = [Rock(x, y) for x, y in positions[:self.ROCK_COUNT]]
 
         # Размещение деревьев
         tree_types = ["birch", "oak", "withered_tree", "withered_white_tree"]
-        for _ in range(5):
-            x, y = self._get_random_position(is_valid_position)
-            occupied_positions.add((x, y))
+        for x, y in positions[self.ROCK_COUNT:]:
             obstacles.append(Tree(x, y, random.choice(tree_types)))
 
         return obstacles
 
-    def _get_random_position(self, is_valid_position):
-        ''' Получение случайной позиции для объекта '''
-        while True:
-            x, y = random.randint(0, self.MAP_WIDTH - 75), random.randint(0, self.MAP_HEIGHT - 75)
-            if is_valid_position(x, y):
-                return x, y
+    def _create_enemies(self, spawn_sampler, player_x, player_y):
+        ''' Создание первых врагов на карте в свободных точках вне экрана '''
+        positions = spawn_sampler.sample_many(random.randint(5, 10), player_x, player_y)
+        return [random.choice([Knight, Skeleton, Demon])(x, y) for x, y in positions]
 
-    def _is_valid_enemy_spawn_position(self, x, y):
-        ''' Проверка на допустимость позиции для размещения врага '''
-        if abs(x - self._player.x) <= self.WINDOW_WIDTH // 2 and abs(y - self._player.y) <= self.WINDOW_HEIGHT // 2:
-            return False
-        if self._is_visible_to_player(x, y):
-            return False
-        if not self._is_valid_enemy_position(x, y):
+    def _spawn_enemy(self, enemy_type):
+        ''' Создание врага из очереди директора; False, если свободного места нет '''
+        position = self._spawn_sampler.sample(self._player.x, self._player.y)
+        if position is None:
             return False
+        enemy = enemy_type(*position)
+        self._enemies.append(enemy)
+        self._enemy_grid.insert(enemy, enemy._rect)
+        if self._enemy_store is not None:
+            self._enemy_store.add(enemy)
         return True
 
-    def _is_valid_enemy_position(self, x, y):
-        ''' Проверка на допустимость позиции врага относительно препятствий '''
-        safe_distance = 150
-        for obstacle in self._obstacles:
-            if obstacle.rect.collidepoint(x, y):
-                return False
-            if abs(x - obstacle.rect.centerx) < safe_distance and abs(y - obstacle.rect.centery) < safe_distance:
-                return False
-        return True
-
-    def _is_visible_to_player(self, x, y):
-        ''' Проверка на видимость позиции врага игроком '''
-        player_rect = pygame.Rect(
-            self._player.x - self.WINDOW_WIDTH // 2,
-            self._player.y - self.WINDOW_HEIGHT // 2,
-            self.WINDOW_WIDTH,
-            self.WINDOW_HEIGHT
-        )
-        return player_rect.collidepoint(x, y)
-
-    def _create_enemies(self):
-        ''' Создание врагов на карте '''
-        enemies = []
-        num_enemies = random.randint(5, 10)
-        for _ in range(num_enemies):
-            enemies.append(self._spawn_enemy())
-        return enemies
-
-    def _spawn_enemy(self):
-        ''' Создание одного врага '''
-        while True:
-            x, y = random.randint(0, self.MAP_WIDTH - 75), random.randint(0, self.MAP_HEIGHT - 75)
-            if self._is_valid_enemy_spawn_position(x, y):
-                enemy_type = random.choice([Knight, Skeleton, Demon])
-                break
-        return enemy_type(x, y)
-
     def run(self):
         ''' Главный цикл игры '''
+        switched = False
         while self._running:
+            # Ожидание кадра в начале: ввод снимается как можно позже, прямо перед симуляцией.
+            # После смены экрана новый экран рисуется сразу, без ожидания
+            if not switched:
+                self._input.wait()
+            events = self._input.poll()
+            state = self._state
+            drawn = False
             if self._state == "menu":
+                self._preloader.start()
                 self._menu.update()
-                self._menu.draw()
-                for event in pygame.event.get():
+                for event in events:
                     self._handle_menu_events(event)
+                if self._state == "menu":
+                    self._menu.draw(None if self._preloader.ready else self._preloader.progress)
+                    drawn = True
             elif self._state == "playing":
-                self._handle_events()
-                self._update_game_state()
-                self._draw_frame()
+                self._profiler.begin_frame()
+                with self._profiler.phase("input"):
+                    self._handle_events(events)
+                # Фиксированный шаг: за кадр выполняется столько шагов, сколько накопилось времени.
+                # Если пришел ввод, а шаг еще не накопился, шаг берется досрочно, чтобы
+                # результат ввода попал уже в этот кадр
+                steps = clock.accumulate(self._input.frame_seconds)
+                if steps == 0 and self._input.input_arrived:
+                    steps = clock.borrow()
+                for _ in range(steps):
+                    if self._state != "playing":
+                        break
+                    self._step()
+                # Без шагов и событий кадр совпал бы с уже выведенным (после досрочного шага)
+                if steps or events or self._renderer.invalidated:
+                    self._draw_frame()
+                    drawn = True
+                self._profiler.end_frame()
             elif self._state == "paused":
-                self._pause_menu.draw(self._elapsed_time, self._defeated_enemies)
-                for event in pygame.event.get():
+                for event in events:
                     self._handle_pause_events(event)
+                if self._state == "paused":
+                    self._pause_menu.draw(self._elapsed_time, self._defeated_enemies)
+                    drawn = True
             elif self._state == "game_over":
-                self._game_over_menu.draw(self._elapsed_time, self._defeated_enemies)
-                for event in pygame.event.get():
+                for event in events:
                     self._handle_game_over_events(event)
-
-            self._clock.tick(self.FPS)
+                if self._state == "game_over":
+                    self._game_over_menu.draw(self._elapsed_time, self._defeated_enemies)
+                    drawn = True
+            switched = self._state != state
+            if drawn and self._input.presented():
+                self._profiler.set_counter("input_latency_p95_ms", round(self._input.percentiles((95,))[95], 1))
+
+            if self._state != "playing":
+                # Экран занят меню, по возвращении в игру нужен полный кадр
+                self._renderer.invalidate()
         self._quit_game()
 
     def _handle_menu_events(self, event):
@@ -170,32 +286,32 @@ class Game:
         elif event.type == pygame.MOUSEBUTTONDOWN:
             action = self._menu.handle_events(event)
             if action == "punk" or action == "cyborg":
+                # Может ждать фонового загрузчика; это время не должно уйти в шаги догона
                 self._start_game()
                 self._state = "playing"
-                self._total_paused_time = 0 
+                self._resume_clock()
 
-    def _handle_events(self):
-        ''' Обработка игровых событий '''
-        for event in pygame.event.get():
+    def _handle_events(self, events):
+        ''' Обработка игровых событий; движение игрок читает из состояния клавиш на шаге '''
+        for event in events:
             if event.type == pygame.QUIT:
+                self._record_event(EVENT_QUIT)
                 self._running = False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    self._state = "paused"
-                    self._pause_start_time = pygame.time.get_ticks()
-                elif event.key == pygame.K_LEFT:
-                    self._player.move_left()
-                elif event.key == pygame.K_RIGHT:
-                    self._player.move_right()
-                elif event.key == pygame.K_UP:
-                    self._player.move_up()
-                elif event.key == pygame.K_DOWN:
-                    self._player.move_down()
-            elif event.type == pygame.KEYUP:
-                if event.key == pygame.K_LEFT or event.key == pygame.K_RIGHT:
-                    self._player.stop_horizontal()
-                elif event.key == pygame.K_UP or event.key == pygame.K_DOWN:
-                    self._player.stop_vertical()
+                    self._record_event(EVENT_PAUSE)
+                    self._pause()
+                elif event.key == pygame.K_F3:
+                    self._record_event(EVENT_TOGGLE_OVERLAY)
+                    self._profiler.toggle_overlay()
+                    # Грязные области не покрывают оверлей: после скрытия он
+                    # остался бы на экране, поэтому кадр перерисовывается целиком
+                    self._renderer.invalidate()
+
+    def _record_event(self, code):
+        ''' Запись события, если включена запись ввода '''
+        if self._recorder is not None:
+            self._recorder.record_event(code)
 
     def _handle_pause_events(self, event):
         ''' Обработка событий в режиме паузы '''
@@ -203,69 +319,259 @@ class Game:
             self._running = False
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
-                self._state = "playing"
-                self._total_paused_time += pygame.time.get_ticks() - self._pause_start_time
+                self._resume()
         elif event.type == pygame.MOUSEBUTTONDOWN:
             action = self._pause_menu.handle_events(event)
             if action == "continue":
-                self._state = "playing"
-                self._total_paused_time += pygame.time.get_ticks() - self._pause_start_time
+                self._resume()
             elif action == "quit":
                 self._state = "menu"
 
-    def _update_game_state(self):
-        ''' Обновление состояния игры '''
-        keys = pygame.key.get_pressed()
-        self._player.update(keys, self.MAP_WIDTH, self.MAP_HEIGHT, self._obstacles)
-        self._update_enemies()
-        self._update_camera()
+    def _pause(self):
+        ''' Пауза: игровые часы останавливаются вместе с кулдаунами и таймером '''
+        self._state = "paused"
+        clock.pause()
+
+    def _resume(self):
+        ''' Продолжение игры после паузы '''
+        self._state = "playing"
+        self._resume_clock()
+
+    def _resume_clock(self):
+        ''' Запуск игровых часов; время кадра считается с этого момента '''
+        clock.resume()
+        self._input.restart_frame()
+
+    def _step(self, keys=None):
+        ''' Один шаг симуляции: продвигает игровые часы и обновляет состояние '''
+        self._previous_view = (self._camera_x, self._camera_y, self._player.x, self._player.y)
+        if self._interpolate:
+            # Снаряды помнят положение до шага сами, врагам его запоминает игра
+            self._previous_enemies = {enemy: (enemy._x, enemy._y) for enemy in self._enemies}
+        clock.advance()
+        # Кулдауны и вспышки урона, срок которых наступил на этом шаге
+        scheduler.run_due(clock.time)
+        if keys is None:
+            keys = self._input.keys
+        if self._recorder is not None:
+            self._recorder.record(keys)
+        self._update_game_state(keys)
+
+    def simulate(self, seconds, input_script=kite_script, trace=None):
+        '''
+        Прогон игры без отрисовки с фиксированным шагом игровых часов.
+        input_script(tick) возвращает набор нажатых клавиш на этом шаге.
+        В список trace, если он передан, после каждого шага добавляется
+        state_digest(). Возвращает сводку прогона
+        '''
+        return self._run_ticks(int(seconds * self.FPS), input_script, trace)
+
+    def replay(self, log, trace=None):
+        '''
+        Повтор записанной сессии: та же игра с тем же зерном и те же клавиши
+        на каждом шаге. Пауза и выход на симуляцию не влияют (во время паузы
+        шаги не выполнялись, после выхода запись кончается), поэтому из
+        событий повторяется только переключение оверлея
+        '''
+        if log.fps != self.FPS:
+            raise ValueError(f"Запись сделана с шагом 1/{log.fps}, а игра работает с шагом 1/{self.FPS}")
+        self._seed = log.seed
+        self._menu._selected_character = log.character
+        self._start_game()
+
+        def script(tick):
+            for code in log.events_at(tick):
+                if code == EVENT_TOGGLE_OVERLAY:
+                    self._profiler.toggle_overlay()
+                    self._renderer.invalidate()
+            return log.keys(tick)
+
+        return self._run_ticks(len(log), script, trace)
+
+    def _run_ticks(self, total_ticks, input_script, trace):
+        ''' Выполняет total_ticks шагов (или до конца игры) и возвращает сводку '''
+        if self._player is None:
+            self._start_game()
+        self._state = "playing"
+        clock.resume()
+        ticks = 0
+        wall_start = time.perf_counter()
+        while ticks < total_ticks and self._state == "playing":
+            self._profiler.begin_frame()
+            self._step(ScriptedKeys(input_script(ticks)))
+            self._profiler.end_frame()
+            if trace is not None:
+                trace.append(self.state_digest())
+            ticks += 1
+        wall_time = time.perf_counter() - wall_start
+        self._write_profile()
+        self._write_recording()
+        return {
+            "ticks": ticks,
+            "simulated_seconds": self._elapsed_time,
+            "wall_seconds": wall_time,
+            "ticks_per_second": ticks / wall_time if wall_time > 0 else float("inf"),
+            "defeated_enemies": self._defeated_enemies,
+            "player_hp": self._player.hp,
+            "game_over": self._state == "game_over",
+        }
+
+    def state_digest(self):
+        ''' Контрольная сумма состояния симуляции для сравнения прогонов шаг за шагом '''
+        state = [self._player.x, self._player.y, self._player.hp, self._defeated_enemies, len(self._enemies)]
+        for enemy in self._enemies:
+            state.extend((enemy._x, enemy._y, enemy._hp))
+        return zlib.crc32(struct.pack(f"<{len(state)}q", *state))
 
-        current_time = pygame.time.get_ticks()
-        self._elapsed_time = (current_time - self._start_time - self._total_paused_time) / 1000
+    def _update_game_state(self, keys=None):
+        ''' Обновление состояния игры '''
+        profiler = self._profiler
+        if keys is None:
+            keys = self._input.keys
+        with profiler.phase("player"):
+            self._player.update(keys, self.MAP_WIDTH, self.MAP_HEIGHT, self._obstacle_grid)
+        with profiler.phase("enemies"):
+            self._update_enemies()
+        with profiler.phase("collisions"):
+            self._handle_fireball_hits()
+        self._elapsed_time = clock.time - self._start_time
+        with profiler.phase("spawns"):
+            # Убитые и новые враги приходят через очередь директора в пределах бюджета шага
+            self._director.plan(self._elapsed_time, len(self._enemies))
+            self._director.drain(self._spawn_enemy, len(self._enemies))
+        with profiler.phase("camera"):
+            self._update_camera()
+        profiler.set_counter("enemies", len(self._enemies))
+        profiler.set_counter("fireballs", len(self._player.fireballs))
+        profiler.set_counter("spawn_queue", self._director.queue_depth)
+        profiler.set_counter("timers", len(scheduler))
 
         if self._player.hp <= 0:
             self._state = "game_over"
 
     def _update_enemies(self):
         ''' Обновление состояния врагов '''
-        for enemy in self._enemies[:]:
-            enemy.update(self._player.x, self._player.y, self._player, self._obstacles)
-            for fireball in self._player._fireballs[:]:
-                if fireball.rect.colliderect(enemy._rect):
-                    enemy.take_damage(self._player.attack_power)
-                    self._player._fireballs.remove(fireball)
-                    if enemy.hp <= 0:
-                        self._enemies.remove(enemy)
-                        self._defeated_enemies += 1
-                        new_enemy = self._spawn_enemy()
-                        self._enemies.append(new_enemy)
-                    break
+        self._enemy_grid.clear()
+        self._flow_field.update(self._player.x, self._player.y)
+        if self._enemy_store is not None:
+            self._enemy_store.update(self._player, clock.time, self._flow_field)
+            self._enemy_store.separate(self._crowd)
+        else:
+            for enemy in self._enemies:
+                enemy.update(self._player.x, self._player.y, self._player, self._obstacle_grid, self._flow_field)
+            self._crowd.apply(self._enemies, self._obstacle_grid)
+        for enemy in self._enemies:
+            self._enemy_grid.insert(enemy, enemy._rect)
+
+    def _handle_fireball_hits(self):
+        ''' Попадания огненных шаров во врагов '''
+        fireballs = self._player.fireballs
+        # Весь путь шара за шаг против сетки врагов: первым задет тот, до кого шар долетел раньше
+        hits = self._enemy_grid.sweep_many([fireball.sweep for fireball in fireballs])
+        for index in range(len(fireballs) - 1, -1, -1):
+            fireball = fireballs[index]
+            hit = hits[index]
+            if hit is not None and hit[1].hp <= 0:
+                # Враг убит другим шаром на этом шаге: ищем следующую цель на пути
+                hit = self._enemy_grid.sweep(*fireball.sweep)
+            if hit is None:
+                if not fireball.active:
+                    fireballs.release(fireball)
+                continue
+            enemy = hit[1]
+            enemy.take_damage(self._player.attack_power)
+            fireballs.release(fireball)
+            if enemy.hp <= 0:
+                self._remove_enemy(enemy)
+                enemy.die()
+                if enemy.dying:
+                    self._corpses.append(enemy)
+                self._defeated_enemies += 1
+        if self._corpses:
+            self._corpses = [corpse for corpse in self._corpses if corpse.dying]
+
+    def _remove_enemy(self, enemy):
+        '''
+        Удаляет врага так же, как EnemyStore освобождает слот: на его место
+        встает последний. Порядок списка совпадает со слотами хранилища, и
+        раздвижение толпы, где ничьи решаются по номеру врага, в обоих
+        режимах получает одинаковые номера
+        '''
+        self._enemy_grid.remove(enemy)
+        index = self._enemies.index(enemy)
+        last = self._enemies.pop()
+        if last is not enemy:
+            self._enemies[index] = last
+        if self._enemy_store is not None:
+            self._enemy_store.remove(enemy)
 
     def _update_camera(self):
         ''' Обновление положения камеры '''
         self._camera_x = max(0, min(self._player.x - self.WINDOW_WIDTH // 2, self.MAP_WIDTH - self.WINDOW_WIDTH))
         self._camera_y = max(0, min(self._player.y - self.WINDOW_HEIGHT // 2, self.MAP_HEIGHT - self.WINDOW_HEIGHT))
 
+    def _interpolated_view(self):
+        '''
+        Камера и смещение игрока для отрисовки между шагами симуляции.
+        Без интерполяции кадр показывает последнее состояние симуляции
+        '''
+        if not self._interpolate:
+            return self._camera_x, self._camera_y, 0, 0
+        alpha = clock.alpha
+        prev_camera_x, prev_camera_y, prev_x, prev_y = self._previous_view
+        camera_x = round(prev_camera_x + (self._camera_x - prev_camera_x) * alpha)
+        camera_y = round(prev_camera_y + (self._camera_y - prev_camera_y) * alpha)
+        player_dx = round((prev_x - self._player.x) * (1 - alpha))
+        player_dy = round((prev_y - self._player.y) * (1 - alpha))
+        return camera_x, camera_y, player_dx, player_dy
+
+    def _interpolation_offset(self, previous):
+        '''
+        Сдвиг объекта слоя от последнего состояния симуляции к положению
+        между шагами с той же долей alpha, что у камеры и игрока.
+        previous(entity) - положение объекта до последнего шага или None
+        '''
+        back = 1 - clock.alpha
+
+        def offset(entity):
+            position = previous(entity)
+            if position is None:
+                return 0, 0
+            return round((position[0] - entity._x) * back), round((position[1] - entity._y) * back)
+
+        return offset
+
     def _draw_frame(self):
         ''' Отрисовка кадров игры '''
-        self._screen.blit(self._background, (-self._camera_x, -self._camera_y))
-        for obstacle in self._obstacles:
-            obstacle.draw(self._screen, self._camera_x, self._camera_y)
-        for enemy in self._enemies:
-            enemy.draw(self._screen, self._camera_x, self._camera_y)
-        self._player.draw(self._screen, self._camera_x, self._camera_y)
-
-        self._draw_timer()
-        self._draw_defeated_enemies()
-        pygame.display.flip()
-
-    def _draw_timer(self):
-        ''' Отрисовка таймера '''
-        font = pygame.font.Font(None, 50)
-        minutes = int(self._elapsed_time // 60)
-        seconds = int(self._elapsed_time % 60)
-        time_text = font.render(f"{minutes:02}:{seconds:02}", True, (255, 255, 255))
-        self._screen.blit(time_text, (self._screen.get_width() // 2 - 50, 20))
+        profiler = self._profiler
+        renderer = self._renderer
+        if profiler.overlay_visible:
+            renderer.invalidate()
+        camera_x, camera_y, player_dx, player_dy = self._interpolated_view()
+        enemy_offset = fireball_offset = None
+        if self._interpolate:
+            enemy_offset = self._interpolation_offset(self._previous_enemies.get)
+            fireball_offset = self._interpolation_offset(lambda fireball: (fireball._prev_x, fireball._prev_y))
+        renderer.begin(camera_x, camera_y)
+        with profiler.phase("draw_background"):
+            renderer.draw_background(self._background)
+        with profiler.phase("draw_obstacles"):
+            renderer.draw_entities(self._obstacles)
+        with profiler.phase("draw_enemies"):
+            renderer.draw_entities(self._corpses)
+            renderer.draw_entities(self._enemies, enemy_offset)
+        with profiler.phase("draw_player"):
+            renderer.mark(self._player.draw(self._screen, camera_x - player_dx, camera_y - player_dy))
+            renderer.draw_entities(self._player.fireballs, fireball_offset)
+
+        with profiler.phase("draw_hud"):
+            renderer.mark(self._hud.draw(self._screen, self._elapsed_time, self._defeated_enemies))
+        profiler.set_counter("drawn", renderer.drawn)
+        profiler.set_counter("background_tiles", TiledBackground.resident_tiles())
+        profiler.set_counter("culled", renderer.culled)
+        profiler.draw_overlay(self._screen)
+        with profiler.phase("flip"):
+            renderer.present()
 
     def _handle_game_over_events(self, event):
         ''' Обработка событий на экране "игра окончена" '''
@@ -275,25 +581,71 @@ class Game:
             if self._game_over_menu._menu_button.collidepoint(event.pos):
                 self._state = "menu"
 
-    def _draw_defeated_enemies(self):
-        ''' Отрисовка количества побежденных врагов '''
-        skull_image = pygame.image.load("images/decor/Skull.png")
-        skull_image = pygame.transform.scale(skull_image, (40, 40))
-        skull_rect = skull_image.get_rect()
-        skull_x = self.WINDOW_WIDTH - skull_rect.width - 10
-        skull_y = 10
-        self._screen.blit(skull_image, (skull_x, skull_y))
-
-        font = pygame.font.Font(None, 36)
-        text = font.render(str(self._defeated_enemies), True, (255, 255, 255))
-        text_rect = text.get_rect(midright=(skull_x - 5, skull_y + skull_rect.height // 2))
-        self._screen.blit(text, text_rect)
-    
+    def _write_profile(self):
+        ''' Выгрузка замеров кадров в CSV, если задан путь '''
+        if self._profile_csv:
+            self._profiler.dump_csv(self._profile_csv)
+
+    def _write_recording(self):
+        ''' Сохранение записи ввода, если она ведется '''
+        if self._recorder is not None:
+            self._recorder.save()
+
+    def _report_input_latency(self):
+        ''' Печать перцентилей задержки "ввод -> экран" за сессию '''
+        p = self._input.percentiles()
+        if any(p.values()):
+            print(f"input latency p50 {p[50]:.1f}  p95 {p[95]:.1f}  p99 {p[99]:.1f} ms")
+
     def _quit_game(self):
         ''' Завершение работы игры '''
+        self._report_input_latency()
+        self._write_profile()
+        self._write_recording()
         pygame.quit()
         sys.exit()
 
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Vampire Survivors")
+    parser.add_argument("--headless", action="store_true", help="прогон симуляции без окна и отрисовки")
+    parser.add_argument("--seconds", type=float, default=60, help="длительность прогона в игровых секундах")
+    parser.add_argument("--character", choices=["Punk", "Cyborg"], default="Cyborg")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--vectorized", action="store_true", help="пакетное обновление врагов через NumPy")
+    parser.add_argument("--profile-csv", default=None, help="файл для выгрузки замеров кадров при выходе")
+    parser.add_argument("--interpolate", action="store_true", help="интерполяция камеры, игрока, врагов и снарядов между шагами")
+    parser.add_argument("--record", default=None, help="файл для записи ввода сессии")
+    parser.add_argument("--replay", default=None, help="повтор записанной сессии без окна")
+    parser.add_argument("--trace", default=None, help="файл для контрольных сумм состояния по шагам (с --replay)")
+    parser.add_argument("--no-asset-pack", action="store_true", help="грузить картинки из images/, а не из пакета")
+    parser.add_argument("--first-frame", action="store_true", help="вывести время до первого кадра меню и выйти")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
+    args = _parse_args()
+    asset_pack = None if args.no_asset_pack else Game.ASSET_PACK
+    if args.first_frame:
+        game = Game(character=args.character, asset_pack=asset_pack)
+        game._menu.update()
+        game._menu.draw()
+        print(f"first_menu_frame_ms: {(time.perf_counter() - _PROCESS_START) * 1000:.1f}", flush=True)
+        pygame.quit()
+    elif args.replay:
+        log = InputLog.load(args.replay)
+        game = Game(headless=True, character=log.character, seed=log.seed, vectorized=args.vectorized,
+                    profile_csv=args.profile_csv, asset_pack=asset_pack)
+        trace = [] if args.trace else None
+        for key, value in game.replay(log, trace).items():
+            print(f"{key}: {value}")
+        if args.trace:
+            with open(args.trace, "w") as file:
+                file.writelines(f"{digest:08x}\n" for digest in trace)
+    elif args.headless:
+        game = Game(headless=True, character=args.character, seed=args.seed, vectorized=args.vectorized,
+                    profile_csv=args.profile_csv, record=args.record, asset_pack=asset_pack)
+        for key, value in game.simulate(args.seconds).items():
+            print(f"{key}: {value}")
+    else:
+        game = Game(seed=args.seed, vectorized=args.vectorized, profile_csv=args.profile_csv,
+                    interpolate=args.interpolate, record=args.record, asset_pack=asset_pack)
+        game.run()
@@ -1,5 +1,6 @@
 import pygame
 from abc import ABC, abstractmethod
+from hud import TextCache
 
 # Базовый класс для всех меню
 class BaseMenu(ABC):
@@ -10,6 +11,7 @@ class BaseMenu(ABC):
         self._background_image = background_image
         self._title_font = pygame.font.Font(None, 74)
         self._button_font = pygame.font.Font(None, 36)
+        self._text_caches = {}
 
     # Свойства для доступа к атрибутам
     @property
@@ -36,9 +38,16 @@ class BaseMenu(ABC):
     def button_font(self):
         return self._button_font
 
+    def render_text(self, text, font, color):
+        ''' Метод для отрисовки текста в поверхность с кэшированием по шрифту '''
+        cache = self._text_caches.get(font)
+        if cache is None:
+            cache = self._text_caches[font] = TextCache(font)
+        return cache.render(text, color)
+
     def draw_text_with_background(self, text, font, text_color, background_color, center):
         ''' Метод для отрисовки текста с фоном '''
-        text_surface = font.render(text, True, text_color)
+        text_surface = self.render_text(text, font, text_color)
         text_rect = text_surface.get_rect(center=center)
         background_rect = text_rect.inflate(10, 10)
         pygame.draw.rect(self._screen, background_color, background_rect)
@@ -46,7 +55,7 @@ class BaseMenu(ABC):
 
     def draw_text_no_background(self, text, font, color, center):
         ''' Метод для отрисовки текста без фона '''
-        text_surface = font.render(text, True, color)
+        text_surface = self.render_text(text, font, color)
         text_rect = text_surface.get_rect(center=center)
         self._screen.blit(text_surface, text_rect)
 
@@ -78,8 +87,8 @@ class Menu(BaseMenu):
         self._cyborg_button = pygame.Rect(window_width // 2 + 50, window_height // 2 - 25, 100, 50)
         self._selected_character = None
 
-    def draw(self):
-        ''' Метод для отрисовки меню '''
+    def draw(self, loading=None):
+        ''' Метод для отрисовки меню; loading - доля подготовки следующей игры, None - все готово '''
         self.draw_background()
 
         title_centers = [
@@ -93,6 +102,9 @@ class Menu(BaseMenu):
         self.draw_button(self._play_button, "Начать", (255, 255, 255), (0, 0, 255))
         self.draw_button(self._punk_button, "Punk", (255, 255, 255), (0, 0, 255))
         self.draw_button(self._cyborg_button, "Cyborg", (255, 255, 255), (0, 0, 255))
+        if loading is not None:
+            self.draw_text_no_background(f"Загрузка {int(loading * 100)}%", self.button_font, (255, 255, 255),
+                                         (self.window_width // 2, self.window_height // 2 + 150))
         
         pygame.display.flip()
 
@@ -121,6 +133,7 @@ class PauseMenu(BaseMenu):
         button_x = window_width // 2 - button_width // 2
         self._continue_button = pygame.Rect(button_x, window_height // 2 - 50, button_width, button_height)
         self._quit_button = pygame.Rect(button_x, window_height // 2 + 50, button_width, button_height)
+        self._info_font = pygame.font.Font(None, 36)
 
     def draw(self, elapsed_time, defeated_enemies):
         ''' Метод для отрисовки меню паузы '''
@@ -128,7 +141,7 @@ class PauseMenu(BaseMenu):
         pause_center = (self.window_width // 2, self.window_height // 2 - 350)
         self.draw_text_no_background("Пауза", self.title_font, (255, 0, 0), pause_center)
         
-        font = pygame.font.Font(None, 36)
+        font = self._info_font
         minutes = int(elapsed_time // 60)
         seconds = int(elapsed_time % 60)
         time_text = f"Time: {minutes:02}:{seconds:02}"
@@ -158,6 +171,7 @@ class GameOverMenu(BaseMenu):
     def __init__(self, screen, window_width, window_height, background_image):
         super().__init__(screen, window_width, window_height, background_image)
         self._menu_button = pygame.Rect(window_width // 2 - 100, window_height // 2 + 50, 200, 50)
+        self._info_font = pygame.font.Font(None, 50)
 
     def draw(self, elapsed_time, defeated_enemies):
         ''' Метод для отрисовки меню окончания игры'''
@@ -166,7 +180,7 @@ class GameOverMenu(BaseMenu):
         game_over_center = (self.window_width // 2, self.window_height // 2 - 350)
         self.draw_text_no_background("Game Over", self.title_font, (255, 0, 0), game_over_center)
         
-        font = pygame.font.Font(None, 50)
+        font = self._info_font
         minutes = int(elapsed_time // 60)
         seconds = int(elapsed_time % 60)
         time_text = f"Time: {minutes:02}:{seconds:02}"
@@ -1,20 +1,24 @@
-import pygame
 from abc import ABC
+from sprites import SpriteCache
 
 class Obstacle(ABC):
     def __init__(self, x, y, image_path):
         self._x = x
         self._y = y
-        self._image = pygame.transform.scale(pygame.image.load(image_path), (75, 75))
+        self._image = SpriteCache.get(image_path, (75, 75))
         self._rect = self._image.get_rect(topleft=(self._x, self._y))
 
     @property
     def rect(self):
         return self._rect
 
+    def sprite(self):
+        ''' Изображение препятствия и его позиция на карте '''
+        return self._image, (self._x, self._y)
+
     def draw(self, screen, camera_x, camera_y):
-        ''' Отрисовка изображения препятствия '''
-        screen.blit(self._image, (self._x - camera_x, self._y - camera_y))
+        ''' Отрисовка изображения препятствия; возвращает измененную область экрана '''
+        return screen.blit(self._image, (self._x - camera_x, self._y - camera_y))
 
 class Rock(Obstacle):
     ''' Создание класса Rock'''
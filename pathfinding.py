@@ -0,0 +1,170 @@
+import pygame
+
+class FlowField:
+    '''
+    Общее для всех врагов поле направлений. Карта делится на клетки,
+    клетка непроходима, если враг с левым верхним углом в любой ее точке
+    задел бы препятствие. Поиск в ширину от клетки игрока дает каждой
+    клетке направление на соседа, который ближе к игроку, поэтому враг
+    получает свой шаг за O(1), а поле пересчитывается только когда
+    игрок переходит в другую клетку. Если задан reach (x, y) в пикселях,
+    поиск идет только в окне такого размера вокруг цели, и цена пересчета
+    не зависит от размера карты; вне окна направления нет, и враг идет
+    к игроку напрямую
+    '''
+    UNREACHABLE = -1
+
+    def __init__(self, map_width, map_height, obstacles, cell_size=40, agent_size=75, reach=None):
+        self._cell_size = cell_size
+        self._cols = (map_width - agent_size) // cell_size + 1
+        self._rows = (map_height - agent_size) // cell_size + 1
+        self._reach = None if reach is None else (reach[0] // cell_size + 1, reach[1] // cell_size + 1)
+        self._passable = self._build_passability(obstacles, agent_size)
+        self._neighbours = self._build_neighbours()
+        size = self._cols * self._rows
+        self._distance = [self.UNREACHABLE] * size
+        self._dir_x = [0] * size
+        self._dir_y = [0] * size
+        self._visited = []
+        self._changed = []
+        self._target = None
+        self._version = 0
+
+    @property
+    def cell_size(self):
+        return self._cell_size
+
+    @property
+    def shape(self):
+        return self._rows, self._cols
+
+    @property
+    def version(self):
+        ''' Номер пересчета; растет каждый раз, когда поле строится заново '''
+        return self._version
+
+    @property
+    def target(self):
+        return self._target
+
+    @property
+    def distance(self):
+        return self._distance
+
+    @property
+    def dir_x(self):
+        return self._dir_x
+
+    @property
+    def dir_y(self):
+        return self._dir_y
+
+    @property
+    def changed(self):
+        ''' Клетки, значения которых мог изменить последний пересчет (с повторами) '''
+        return self._changed
+
+    def _build_passability(self, obstacles, agent_size):
+        ''' Сетка проходимости по прямоугольникам препятствий '''
+        size = self._cell_size
+        passable = [True] * (self._cols * self._rows)
+        # Прямоугольник всех положений врага, чей левый верхний угол лежит в клетке
+        span = size + agent_size - 1
+        for obstacle in obstacles:
+            rect = obstacle.rect
+            col0 = max(0, (rect.left - span) // size)
+            col1 = min(self._cols - 1, rect.right // size)
+            row0 = max(0, (rect.top - span) // size)
+            row1 = min(self._rows - 1, rect.bottom // size)
+            for row in range(row0, row1 + 1):
+                for col in range(col0, col1 + 1):
+                    if rect.colliderect(pygame.Rect(col * size, row * size, span, span)):
+                        passable[row * self._cols + col] = False
+        return passable
+
+    def _build_neighbours(self):
+        '''
+        Для каждой клетки - проходимые соседи в порядке обхода: (номер,
+        столбец, строка, шаг соседа обратно к клетке по x и по y)
+        '''
+        cols, rows = self._cols, self._rows
+        passable = self._passable
+        neighbours = []
+        for index in range(cols * rows):
+            row, col = divmod(index, cols)
+            found = []
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                ncol, nrow = col + dx, row + dy
+                if 0 <= ncol < cols and 0 <= nrow < rows and passable[nrow * cols + ncol]:
+                    found.append((nrow * cols + ncol, ncol, nrow, -dx, -dy))
+            neighbours.append(tuple(found))
+        return neighbours
+
+    def cell_of(self, x, y):
+        ''' Клетка (col, row) для точки, с ограничением краями карты '''
+        col = min(self._cols - 1, max(0, int(x) // self._cell_size))
+        row = min(self._rows - 1, max(0, int(y) // self._cell_size))
+        return col, row
+
+    def update(self, target_x, target_y):
+        ''' Пересчитывает поле, если цель перешла в другую клетку '''
+        target = self.cell_of(target_x, target_y)
+        if target != self._target:
+            self._target = target
+            self._compute(target)
+
+    def _compute(self, target):
+        '''
+        Поиск в ширину от клетки цели по проходимым клеткам (в окне reach).
+        Заново заполняются только клетки прошлого и нового обхода, а не вся карта
+        '''
+        unreachable = self.UNREACHABLE
+        distance, dir_x, dir_y = self._distance, self._dir_x, self._dir_y
+        for index in self._visited:
+            distance[index] = unreachable
+            dir_x[index] = dir_y[index] = 0
+        target_col, target_row = target
+        if self._reach is None:
+            col0, row0, col1, row1 = 0, 0, self._cols - 1, self._rows - 1
+        else:
+            reach_cols, reach_rows = self._reach
+            col0, col1 = target_col - reach_cols, target_col + reach_cols
+            row0, row1 = target_row - reach_rows, target_row + reach_rows
+        neighbours = self._neighbours
+        start = target_row * self._cols + target_col
+        distance[start] = 0
+        visited = [start]  # Одновременно очередь обхода: голова - head
+        head = 0
+        while head < len(visited):
+            index = visited[head]
+            head += 1
+            next_distance = distance[index] + 1
+            # Сосед, до которого дошли из этой клетки, идет к ней в обратную сторону
+            for neighbour, ncol, nrow, step_x, step_y in neighbours[index]:
+                found = distance[neighbour]
+                if found == unreachable:
+                    if col0 <= ncol <= col1 and row0 <= nrow <= row1:
+                        distance[neighbour] = next_distance
+                        dir_x[neighbour], dir_y[neighbour] = step_x, step_y
+                        visited.append(neighbour)
+                elif found == next_distance:
+                    # Из равных путей выбираем шаг по оси с большим расстоянием до цели
+                    if abs(ncol - target_col) > abs(nrow - target_row):
+                        if step_x != 0:
+                            dir_x[neighbour], dir_y[neighbour] = step_x, 0
+                    elif step_y != 0:
+                        dir_x[neighbour], dir_y[neighbour] = 0, step_y
+        self._changed = self._visited + visited
+        self._visited = visited
+        self._version += 1
+
+    def direction_at(self, x, y):
+        '''
+        Направление (dx, dy) для врага с левым верхним углом в точке (x, y).
+        None, если клетка непроходима, недостижима или это клетка цели
+        '''
+        col, row = self.cell_of(x, y)
+        index = row * self._cols + col
+        if self._distance[index] <= 0:
+            return None
+        return self._dir_x[index], self._dir_y[index]
@@ -1,14 +1,17 @@
 import pygame
 from abc import ABC, abstractmethod
-import time
-from fireball import Fireball
-from algorithm import aabb_collision
+from fireball import FireballPool
+from animation import Clip, AnimationSet
+from game_clock import clock
+from scheduler import scheduler
 
 class Player(ABC):
     ''' Базовый класс Player, от которого наследуются все игроки '''
     BASE_SPEED = 5
     BASE_HP = 100
     BASE_ATTACK_POWER = 10
+    HURT_DURATION = 1
+    ANIMATIONS = None  # AnimationSet подкласса: клипы "run", "idle", "hurt" и "hurt_moving"
 
     def __init__(self, x, y, speed_coeff, hp_coeff, attack_power_coeff):
         self._x = x
@@ -16,25 +19,17 @@ class Player(ABC):
         self._speed = int(self.BASE_SPEED * speed_coeff)  
         self._hp = int(self.BASE_HP * hp_coeff)  
         self._attack_power = int(self.BASE_ATTACK_POWER * attack_power_coeff)  
-        self._current_sprite = 0  
+        self._phase = 0  # Время начала текущего клипа бега или покоя
         self._is_facing_left = False  
         self._is_moving = False  
         self._hurt = False  
-        self._hurt_start_time = 0  
-
-        self._images_right = []
-        self._images_left = []
-        self._idle_images_right = []
-        self._idle_images_left = []
-        self._hurt_image_right = None
-        self._hurt_image_left = None
-        self._hurt_image_2_right = None
-        self._hurt_image_2_left = None
+        self._hurt_timer = None
+        self.ANIMATIONS.load()
 
         self._rect = pygame.Rect(self._x, self._y, 75, 75)
-        self._fireballs = []
-        self._last_fire_time = 0
+        self._fireballs = FireballPool()
         self._fire_delay = 0.5  
+        self._fire_ready = True  # Снова True по событию планировщика через _fire_delay после выстрела
 
     # Свойства для координат и характеристик игрока
     @property
@@ -71,7 +66,7 @@ class Player(ABC):
 
     def update(self, keys, map_width, map_height, obstacles):
         ''' Обновление состояния игрока '''
-        self._is_moving = False
+        was_moving, self._is_moving = self._is_moving, False
         prev_x, prev_y = self._x, self._y
 
         if keys[pygame.K_w]: self.move(0, -self.speed)
@@ -83,16 +78,13 @@ class Player(ABC):
             self.shoot_fireball()
 
         self._rect.topleft = (self._x, self._y)
-        for obstacle in obstacles:
-            if aabb_collision(self._rect, obstacle.rect):
-                self._x, self._y = prev_x, prev_y
-                self._rect.topleft = (self._x, self._y)
-                break
+        if obstacles.first_collision(self._rect) is not None:
+            self._x, self._y = prev_x, prev_y
+            self._rect.topleft = (self._x, self._y)
 
         self.clamp_position(map_width, map_height)
-
-        if self._hurt and time.time() - self._hurt_start_time > 1:
-            self._hurt = False
+        if self._is_moving != was_moving:
+            self._phase = clock.time
 
         self._update_fireballs(map_width, map_height, obstacles)
 
@@ -105,29 +97,28 @@ class Player(ABC):
         if facing_left is not None:
             self._is_facing_left = facing_left
 
+    @property
+    def rect(self):
+        return self._rect
+
+    @property
+    def fireballs(self):
+        return self._fireballs
+
     def draw(self, screen, camera_x, camera_y):
-        ''' Метод для отрисовки игрока и огненных шаров '''
-        self._draw_player(screen, camera_x, camera_y)
-        self._draw_fireballs(screen, camera_x, camera_y)
+        ''' Метод для отрисовки игрока; возвращает измененную область экрана '''
+        return self._draw_player(screen, camera_x, camera_y)
 
     def _draw_player(self, screen, camera_x, camera_y):
         ''' Метод для отрисовки игрока '''
         if self._hurt:
-            if self._is_moving:
-                image = self._hurt_image_2_left if self._is_facing_left else self._hurt_image_2_right
-            else:
-                image = self._hurt_image_left if self._is_facing_left else self._hurt_image_right
+            name = "hurt_moving" if self._is_moving else "hurt"
         else:
-            if self._is_moving:
-                images = self._images_left if self._is_facing_left else self._images_right
-                self._current_sprite = (self._current_sprite + 0.1) % len(images)
-            else:
-                images = self._idle_images_left if self._is_facing_left else self._idle_images_right
-                self._current_sprite = 0
-            image = images[int(self._current_sprite)]
+            name = "run" if self._is_moving else "idle"
+        image = self.ANIMATIONS.frame(name, clock.time - self._phase, self._is_facing_left)
 
-        screen.blit(image, (self._x - camera_x, self._y - camera_y))
-        self._draw_health_bar(screen, camera_x, camera_y)
+        sprite_rect = screen.blit(image, (self._x - camera_x, self._y - camera_y))
+        return sprite_rect.union(self._draw_health_bar(screen, camera_x, camera_y))
 
     def _draw_health_bar(self, screen, camera_x, camera_y):
         ''' Метод для отрисовки полосы здоровья '''
@@ -143,12 +134,26 @@ class Player(ABC):
 
         pygame.draw.rect(screen, (255, 0, 0), fill_rect)  # Отрисовка заполнения полосы здоровья
         pygame.draw.rect(screen, (255, 255, 255), outline_rect, 2)  # Отрисовка контура полосы здоровья
+        return outline_rect
 
     def take_damage(self, damage):
         ''' Метод для получения урона '''
         self._hp = max(0, self._hp - damage)
         self._hurt = True
-        self._hurt_start_time = time.time()
+        if self._hurt_timer is not None:
+            scheduler.cancel(self._hurt_timer)
+        self._hurt_timer = scheduler.schedule(clock.time, self.HURT_DURATION, self._clear_hurt, strict=True)
+
+    def _clear_hurt(self):
+        self._hurt = False
+
+    def _reload(self):
+        ''' Выстрел сделан: следующий возможен через _fire_delay '''
+        self._fire_ready = False
+        scheduler.schedule(clock.time, self._fire_delay, self._ready_fire)
+
+    def _ready_fire(self):
+        self._fire_ready = True
 
     def attack_enemy(self, enemy):
         ''' Метод для атаки врага '''
@@ -159,59 +164,52 @@ class Player(ABC):
         self._x = max(0, min(self._x, map_width - 75))
         self._y = max(0, min(self._y, map_height - 75))
 
-    def _draw_fireballs(self, screen, camera_x, camera_y):
-        ''' Метод для отрисовки огненных шаров '''
-        for fireball in self._fireballs:
-            fireball.draw(screen, camera_x, camera_y)
-
     def _update_fireballs(self, map_width, map_height, obstacles):
         ''' Update the state of fireballs '''
-        for fireball in self._fireballs[:]:
+        fireballs = self._fireballs
+        # Обход с конца: удаление переставляет последний шар на место текущего
+        for index in range(len(fireballs) - 1, -1, -1):
+            fireball = fireballs[index]
+            if not fireball.active:
+                fireballs.release(fireball)
+                continue
             fireball.update()
             if (fireball._x < 0 or fireball._x > map_width or
                 fireball._y < 0 or fireball._y > map_height):
-                self._fireballs.remove(fireball)
-            else:
-                for obstacle in obstacles:
-                    if aabb_collision(fireball.rect, obstacle.rect):
-                        self._fireballs.remove(fireball)
-                        break
-
-    def _load_images(self, paths):
-        ''' Метод для загрузки изображений '''
-        return [pygame.transform.scale(pygame.image.load(path), (75, 75)) for path in paths]
+                fireballs.release(fireball)
+        # Путь за шаг проверяется целиком, чтобы быстрый шар не проскочил препятствие.
+        # Остановленный шар остается до проверки попаданий во врагов на этом же шаге
+        for fireball, hit in zip(fireballs, obstacles.sweep_many([f.sweep for f in fireballs])):
+            if hit is not None:
+                fireball.stop_at(hit[0])
+
+def _clips(run_paths, idle_paths, hurt_path, hurt_moving_path):
+    ''' Клипы игрока размером 75x75; бег и покой идут со скоростью 3 кадра в секунду '''
+    return AnimationSet({
+        "run": Clip(run_paths, (75, 75), 3),
+        "idle": Clip(idle_paths, (75, 75), 3),
+        "hurt": Clip([hurt_path], (75, 75), 1),
+        "hurt_moving": Clip([hurt_moving_path], (75, 75), 1),
+    })
 
 class Punk(Player):
     ''' Класс Punk, наследующийся от Player '''
+    ANIMATIONS = _clips(
+        [f"images/hero/Punk/Run/Punk_run_{i}.png" for i in range(1, 7)],
+        [f"images/hero/Punk/idle/Punk_idle_{i}.png" for i in range(1, 5)],
+        "images/hero/Punk/Hurt/Punk_hurt.png",
+        "images/hero/Punk/Hurt/Punk_hurt_2.png",
+    )
+
     def __init__(self, x, y):
         speed_coeff = 1.2
         hp_coeff = 1.3
         attack_power_coeff = 1.1
         super().__init__(x, y, speed_coeff, hp_coeff, attack_power_coeff)
-        self._images_right = self._load_images([
-            "images/hero/Punk/Run/Punk_run_1.png",
-            "images/hero/Punk/Run/Punk_run_2.png",
-            "images/hero/Punk/Run/Punk_run_3.png",
-            "images/hero/Punk/Run/Punk_run_4.png",
-            "images/hero/Punk/Run/Punk_run_5.png",
-            "images/hero/Punk/Run/Punk_run_6.png"
-        ])
-        self._images_left = [pygame.transform.flip(image, True, False) for image in self._images_right]
-        self._idle_images_right = self._load_images([
-            "images/hero/Punk/Idle/Punk_idle_1.png",
-            "images/hero/Punk/Idle/Punk_idle_2.png",
-            "images/hero/Punk/Idle/Punk_idle_3.png",
-            "images/hero/Punk/Idle/Punk_idle_4.png"
-        ])
-        self._idle_images_left = [pygame.transform.flip(image, True, False) for image in self._idle_images_right]
-        self._hurt_image_right = pygame.transform.scale(pygame.image.load("images/hero/Punk/Hurt/Punk_hurt.png"), (75, 75))
-        self._hurt_image_left = pygame.transform.flip(self._hurt_image_right, True, False)
-        self._hurt_image_2_right = pygame.transform.scale(pygame.image.load("images/hero/Punk/Hurt/Punk_hurt_2.png"), (75, 75))
-        self._hurt_image_2_left = pygame.transform.flip(self._hurt_image_2_right, True, False)
 
     def update(self, keys, map_width, map_height, obstacles):
         ''' Метод для обновления состояния игрока '''
-        self._is_moving = False
+        was_moving, self._is_moving = self._is_moving, False
         prev_x, prev_y = self._x, self._y
 
         if keys[pygame.K_w]: self.move(0, -self.speed)
@@ -223,59 +221,41 @@ class Punk(Player):
             self.shoot_fireball()
 
         self._rect.topleft = (self._x, self._y)
-        for obstacle in obstacles:
-            if self._rect.colliderect(obstacle.rect):
-                self._x, self._y = prev_x, prev_y
-                self._rect.topleft = (self._x, self._y)
-                break
+        if obstacles.first_collision(self._rect) is not None:
+            self._x, self._y = prev_x, prev_y
+            self._rect.topleft = (self._x, self._y)
 
         self.clamp_position(map_width, map_height)
-
-        if self._hurt and time.time() - self._hurt_start_time > 1:
-            self._hurt = False
+        if self._is_moving != was_moving:
+            self._phase = clock.time
 
         self._update_fireballs(map_width, map_height, obstacles)
 
     def shoot_fireball(self):
         """ Метод для стрельбы огненным шаром """
-        current_time = time.time()
-        if current_time - self._last_fire_time >= self._fire_delay:
+        if self._fire_ready:
             direction = "left" if self._is_facing_left else "right"
-            fireball = Fireball(self._x, self._y, direction, "Punk")
-            self._fireballs.append(fireball)
-            self._last_fire_time = current_time
+            self._fireballs.spawn(self._x, self._y, direction, "Punk")
+            self._reload()
 
 class Cyborg(Player):
     ''' Класс Cyborg, наследующийся от Player '''
+    ANIMATIONS = _clips(
+        [f"images/hero/Cyborg/Run/Cyborg_run_{i}.png" for i in range(1, 7)],
+        [f"images/hero/Cyborg/Idle/Cyborg_idle_{i}.png" for i in range(1, 5)],
+        "images/hero/Cyborg/Hurt/Cyborg_hurt_1.png",
+        "images/hero/Cyborg/Hurt/Cyborg_hurt_2.png",
+    )
+
     def __init__(self, x, y):
         speed_coeff = 1.1
         hp_coeff = 1.3
         attack_power_coeff = 1.5
         super().__init__(x, y, speed_coeff, hp_coeff, attack_power_coeff)
-        self._images_right = self._load_images([
-            "images/hero/Cyborg/Run/Cyborg_run_1.png",
-            "images/hero/Cyborg/Run/Cyborg_run_2.png",
-            "images/hero/Cyborg/Run/Cyborg_run_3.png",
-            "images/hero/Cyborg/Run/Cyborg_run_4.png",
-            "images/hero/Cyborg/Run/Cyborg_run_5.png",
-            "images/hero/Cyborg/Run/Cyborg_run_6.png"
-        ])
-        self._images_left = [pygame.transform.flip(image, True, False) for image in self._images_right]
-        self._idle_images_right = self._load_images([
-            "images/hero/Cyborg/Idle/Cyborg_idle_1.png",
-            "images/hero/Cyborg/Idle/Cyborg_idle_2.png",
-            "images/hero/Cyborg/Idle/Cyborg_idle_3.png",
-            "images/hero/Cyborg/Idle/Cyborg_idle_4.png"
-        ])
-        self._idle_images_left = [pygame.transform.flip(image, True, False) for image in self._idle_images_right]
-        self._hurt_image_right = pygame.transform.scale(pygame.image.load("images/hero/Cyborg/Hurt/Cyborg_hurt_1.png"), (75, 75))
-        self._hurt_image_left = pygame.transform.flip(self._hurt_image_right, True, False)
-        self._hurt_image_2_right = pygame.transform.scale(pygame.image.load("images/hero/Cyborg/Hurt/Cyborg_hurt_2.png"), (75, 75))
-        self._hurt_image_2_left = pygame.transform.flip(self._hurt_image_2_right, True, False)
 
     def update(self, keys, map_width, map_height, obstacles):
         ''' Метод для обновления состояния игрока '''
-        self._is_moving = False
+        was_moving, self._is_moving = self._is_moving, False
         prev_x, prev_y = self._x, self._y
 
         if keys[pygame.K_w]: self.move(0, -self.speed)
@@ -287,24 +267,19 @@ class Cyborg(Player):
             self.shoot_fireball()
 
         self._rect.topleft = (self._x, self._y)
-        for obstacle in obstacles:
-            if self._rect.colliderect(obstacle.rect):
-                self._x, self._y = prev_x, prev_y
-                self._rect.topleft = (self._x, self._y)
-                break
+        if obstacles.first_collision(self._rect) is not None:
+            self._x, self._y = prev_x, prev_y
+            self._rect.topleft = (self._x, self._y)
 
         self.clamp_position(map_width, map_height)
-
-        if self._hurt and time.time() - self._hurt_start_time > 1:
-            self._hurt = False
+        if self._is_moving != was_moving:
+            self._phase = clock.time
 
         self._update_fireballs(map_width, map_height, obstacles)
 
     def shoot_fireball(self):
         """ Метод для стрельбы огненным шаром. """
-        current_time = time.time()
-        if current_time - self._last_fire_time >= self._fire_delay:
+        if self._fire_ready:
             direction = "left" if self._is_facing_left else "right"
-            fireball = Fireball(self._x, self._y, direction, "Cyborg")
-            self._fireballs.append(fireball)
-            self._last_fire_time = current_time
\ No newline at end of file
+            self._fireballs.spawn(self._x, self._y, direction, "Cyborg")
+            self._reload()
\ No newline at end of file
@@ -0,0 +1,65 @@
+import threading
+
+class Preloader:
+    '''
+    Подготовка следующей игры в фоновом потоке, пока показывается меню.
+    prepare(report) строит мир и сообщает долю готовности через
+    report(0..1); декодирование и масштабирование картинок в pygame
+    отпускают GIL, поэтому меню в это время продолжает рисоваться.
+    take() отдает готовый результат (дожидаясь потока, если он еще идет)
+    и перебрасывает исключение, случившееся в потоке
+    '''
+    def __init__(self, prepare):
+        self._prepare = prepare
+        self._thread = None
+        self._ready = threading.Event()
+        self._progress = 0.0
+        self._result = None
+        self._error = None
+
+    @property
+    def started(self):
+        return self._thread is not None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    @property
+    def progress(self):
+        ''' Доля готовности 0..1 '''
+        return self._progress
+
+    def start(self):
+        ''' Запускает подготовку; повторный вызов до take() ничего не делает '''
+        if self._thread is not None:
+            return
+        self._ready.clear()
+        self._progress = 0.0
+        self._result = self._error = None
+        self._thread = threading.Thread(target=self._run, name="preloader", daemon=True)
+        self._thread.start()
+
+    def _report(self, progress):
+        self._progress = progress
+
+    def _run(self):
+        try:
+            self._result = self._prepare(self._report)
+            self._progress = 1.0
+        except BaseException as error:
+            self._error = error
+        finally:
+            self._ready.set()
+
+    def take(self):
+        ''' Готовый результат; после вызова загрузчик можно запускать снова '''
+        if self._thread is None:
+            raise RuntimeError("Подготовка не запускалась")
+        self._thread.join()
+        self._thread = None
+        result, error = self._result, self._error
+        self._result = self._error = None
+        if error is not None:
+            raise error
+        return result
@@ -0,0 +1,136 @@
+import csv
+import time
+from collections import deque
+import pygame
+
+class _Phase:
+    ''' Контекстный менеджер, замеряющий одну фазу кадра '''
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler, name):
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profiler.add(self._name, time.perf_counter() - self._start)
+        return False
+
+class FrameProfiler:
+    '''
+    Замеры времени по фазам кадра. Хранит скользящее окно последних кадров
+    для перцентилей (p50/p95/p99), рисует оверлей поверх игры и
+    выгружает построчную статистику кадров в CSV. Строки кадров
+    копятся только при keep_rows, иначе память не растет со временем игры
+    '''
+    HISTORY = 300
+    OVERLAY_COLOR = (255, 255, 0)
+
+    def __init__(self, keep_rows=False):
+        self._keep_rows = keep_rows
+        self._phases = []  # Порядок фаз в порядке первого появления
+        self._current = {}
+        self._frame_start = None
+        self._frame_times = deque(maxlen=self.HISTORY)
+        self._phase_history = {}
+        self._rows = []
+        self._counters = {}
+        self._overlay_visible = False
+        self._font = None
+
+    @property
+    def overlay_visible(self):
+        return self._overlay_visible
+
+    @property
+    def rows(self):
+        return self._rows
+
+    def reset_rows(self):
+        ''' Забывает строки кадров (новая игра) '''
+        self._rows = []
+
+    def toggle_overlay(self):
+        ''' Включает/выключает оверлей '''
+        self._overlay_visible = not self._overlay_visible
+
+    def begin_frame(self):
+        ''' Начало кадра '''
+        self._current = {}
+        self._frame_start = time.perf_counter()
+
+    def phase(self, name):
+        ''' Замер фазы: with profiler.phase("enemies"): ... '''
+        return _Phase(self, name)
+
+    def add(self, name, seconds):
+        ''' Добавляет время к фазе текущего кадра '''
+        if name not in self._phase_history:
+            self._phases.append(name)
+            self._phase_history[name] = deque(maxlen=self.HISTORY)
+        self._current[name] = self._current.get(name, 0.0) + seconds
+
+    def set_counter(self, name, value):
+        ''' Запоминает произвольную метрику кадра (например, число врагов) '''
+        self._counters[name] = value
+
+    def end_frame(self):
+        ''' Конец кадра: сохраняет строку и обновляет скользящее окно '''
+        if self._frame_start is None:
+            return
+        total = time.perf_counter() - self._frame_start
+        self._frame_start = None
+        self._frame_times.append(total)
+        for name in self._phases:
+            self._phase_history[name].append(self._current.get(name, 0.0))
+        if not self._keep_rows:
+            return
+        row = {"frame": len(self._rows), "total_ms": total * 1000}
+        for name, seconds in self._current.items():
+            row[name + "_ms"] = seconds * 1000
+        row.update(self._counters)
+        self._rows.append(row)
+
+    def percentiles(self, values=(50, 95, 99)):
+        ''' Перцентили времени кадра в миллисекундах по скользящему окну '''
+        if not self._frame_times:
+            return {p: 0.0 for p in values}
+        ordered = sorted(self._frame_times)
+        last = len(ordered) - 1
+        return {p: ordered[min(last, int(round(p / 100 * last)))] * 1000 for p in values}
+
+    def phase_means(self):
+        ''' Среднее время каждой фазы в миллисекундах по скользящему окну '''
+        return {name: sum(history) / len(history) * 1000
+                for name, history in self._phase_history.items() if history}
+
+    def draw_overlay(self, screen):
+        ''' Рисует оверлей с перцентилями и временем фаз '''
+        if not self._overlay_visible:
+            return
+        if self._font is None:
+            self._font = pygame.font.Font(None, 24)
+        p = self.percentiles()
+        lines = [f"frame p50 {p[50]:.2f}  p95 {p[95]:.2f}  p99 {p[99]:.2f} ms"]
+        lines += [f"{name}: {ms:.2f} ms" for name, ms in self.phase_means().items()]
+        lines += [f"{name}: {value}" for name, value in self._counters.items()]
+        y = 10
+        for line in lines:
+            text = self._font.render(line, True, self.OVERLAY_COLOR)
+            screen.blit(text, (10, y))
+            y += text.get_height() + 2
+
+    def dump_csv(self, path):
+        ''' Выгружает построчную статистику кадров в CSV '''
+        columns = ["frame", "total_ms"] + [name + "_ms" for name in self._phases]
+        for row in self._rows:
+            for key in row:
+                if key not in columns:
+                    columns.append(key)
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=columns, restval=0)
+            writer.writeheader()
+            writer.writerows(self._rows)
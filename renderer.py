@@ -0,0 +1,106 @@
+import pygame
+
+class Renderer:
+    '''
+    Этап отрисовки игрового кадра. Отсекает объекты, не попадающие в
+    прямоугольник камеры, и считает нарисованные и отсеченные объекты.
+    Пока камера стоит на месте, фон восстанавливается только под
+    измененными областями, а кадр выводится через
+    pygame.display.update(dirty_rects) вместо полного flip
+    '''
+    def __init__(self, screen):
+        self._screen = screen
+        self._view = pygame.Rect((0, 0), screen.get_size())
+        self._camera = None
+        self._full_redraw = True
+        self._force_full_redraw = True
+        self._dirty = []
+        self._previous_dirty = []
+        self._drawn = 0
+        self._culled = 0
+
+    @property
+    def view(self):
+        return self._view
+
+    @property
+    def drawn(self):
+        return self._drawn
+
+    @property
+    def culled(self):
+        return self._culled
+
+    @property
+    def full_redraw(self):
+        return self._full_redraw
+
+    @property
+    def invalidated(self):
+        ''' Запрошена ли полная перерисовка следующего кадра '''
+        return self._force_full_redraw
+
+    def invalidate(self):
+        ''' Следующий кадр будет перерисован и выведен целиком '''
+        self._force_full_redraw = True
+
+    def begin(self, camera_x, camera_y):
+        ''' Начало кадра: запоминает камеру и решает, нужна ли полная перерисовка '''
+        camera = (camera_x, camera_y)
+        self._view.topleft = camera
+        self._full_redraw = self._force_full_redraw or camera != self._camera
+        self._force_full_redraw = False
+        self._camera = camera
+        self._dirty = []
+        self._drawn = 0
+        self._culled = 0
+
+    def draw_background(self, background):
+        ''' Рисует видимую часть фона или восстанавливает его под прошлыми спрайтами '''
+        background.prepare(self._view)
+        if self._full_redraw:
+            background.draw(self._screen, self._view)
+            return
+        camera_x, camera_y = self._camera
+        for rect in self._previous_dirty:
+            background.draw(self._screen, rect.move(camera_x, camera_y), rect.topleft)
+
+    def draw_entities(self, entities, offset=None):
+        '''
+        Рисует один слой: объекты, прямоугольник которых пересекается с камерой.
+        Отсечение делает Rect.collidelistall, а все кадры слоя уходят на экран
+        одним вызовом Surface.blits. offset(entity), если задан, возвращает
+        сдвиг (dx, dy) кадра объекта (интерполяция между шагами)
+        '''
+        camera_x, camera_y = self._camera
+        visible = self._view.collidelistall([entity.rect for entity in entities])
+        self._culled += len(entities) - len(visible)
+        if not visible:
+            return
+        batch = []
+        for index in visible:
+            entity = entities[index]
+            image, (x, y) = entity.sprite()
+            if offset is not None:
+                dx, dy = offset(entity)
+                x, y = x + dx, y + dy
+            batch.append((image, (x - camera_x, y - camera_y)))
+        self._drawn += len(batch)
+        self._dirty.extend(self._screen.blits(batch))
+
+    def mark(self, rects):
+        ''' Добавляет измененные области экрана (Rect или список Rect) '''
+        if rects is None:
+            return
+        if isinstance(rects, pygame.Rect):
+            self._dirty.append(rects)
+        else:
+            self._dirty.extend(rects)
+
+    def present(self):
+        ''' Выводит кадр на экран '''
+        if self._full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._previous_dirty + self._dirty)
+        self._previous_dirty = self._dirty
@@ -0,0 +1,154 @@
+import struct
+import pygame
+from simulation import ScriptedKeys
+
+# Клавиши, от которых зависит симуляция; бит i маски соответствует RECORDED_KEYS[i]
+RECORDED_KEYS = (pygame.K_w, pygame.K_s, pygame.K_a, pygame.K_d, pygame.K_SPACE)
+
+# События, обработанные в Game._handle_events
+EVENT_QUIT = 1
+EVENT_PAUSE = 2
+EVENT_TOGGLE_OVERLAY = 3
+
+CHARACTERS = ("Punk", "Cyborg")
+
+_MAGIC = b"VSRP"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBqBH")  # магия, версия, зерно, персонаж, шагов в секунду
+
+def keys_to_mask(keys):
+    ''' Битовая маска записываемых клавиш из pygame.key.get_pressed() или ScriptedKeys '''
+    mask = 0
+    for bit, key in enumerate(RECORDED_KEYS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+def mask_to_keys(mask):
+    ''' ScriptedKeys с клавишами из битовой маски '''
+    return ScriptedKeys(key for bit, key in enumerate(RECORDED_KEYS) if mask >> bit & 1)
+
+def _write_varint(out, value):
+    ''' Беззнаковое число переменной длины (7 бит на байт) '''
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, offset):
+    ''' Читает число переменной длины; возвращает (значение, новое смещение) '''
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+class InputLog:
+    '''
+    Запись сессии: зерно генератора случайных чисел, персонаж, маски
+    нажатых клавиш на каждом шаге симуляции и события с номером шага.
+    В файле маски хранятся сериями (длина серии, маска), а номера шагов
+    событий - разностями с предыдущим, все числа в формате varint
+    '''
+    def __init__(self, seed, character, fps, masks=None, events=None):
+        self.seed = seed
+        self.character = character
+        self.fps = fps
+        self.masks = masks if masks is not None else []
+        self.events = events if events is not None else []  # Пары (шаг, код события)
+
+    def __len__(self):
+        return len(self.masks)
+
+    def keys(self, tick):
+        ''' Нажатые клавиши на шаге tick; подходит как input_script для Game.simulate '''
+        return mask_to_keys(self.masks[tick]).pressed
+
+    def events_at(self, tick):
+        ''' Коды событий, случившихся перед шагом tick '''
+        return [code for event_tick, code in self.events if event_tick == tick]
+
+    def to_bytes(self):
+        ''' Сериализация записи '''
+        out = bytearray(_HEADER.pack(_MAGIC, _VERSION, self.seed,
+                                     CHARACTERS.index(self.character), self.fps))
+        runs = []
+        for mask in self.masks:
+            if runs and runs[-1][1] == mask:
+                runs[-1][0] += 1
+            else:
+                runs.append([1, mask])
+        _write_varint(out, len(runs))
+        for length, mask in runs:
+            _write_varint(out, length)
+            out.append(mask)
+        _write_varint(out, len(self.events))
+        previous = 0
+        for tick, code in self.events:
+            _write_varint(out, tick - previous)
+            out.append(code)
+            previous = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        ''' Разбор записи, созданной to_bytes '''
+        magic, version, seed, character, fps = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Неизвестный формат записи ввода")
+        offset = _HEADER.size
+        masks = []
+        count, offset = _read_varint(data, offset)
+        for _ in range(count):
+            length, offset = _read_varint(data, offset)
+            masks.extend([data[offset]] * length)
+            offset += 1
+        events = []
+        count, offset = _read_varint(data, offset)
+        tick = 0
+        for _ in range(count):
+            delta, offset = _read_varint(data, offset)
+            tick += delta
+            events.append((tick, data[offset]))
+            offset += 1
+        return cls(seed, CHARACTERS[character], fps, masks, events)
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+class InputRecorder:
+    ''' Запись ввода текущей игры: маска клавиш на каждом шаге и события между шагами '''
+    def __init__(self, path):
+        self._path = path
+        self._log = None
+
+    @property
+    def log(self):
+        return self._log
+
+    def begin(self, seed, character, fps):
+        ''' Начало записи новой игры '''
+        self._log = InputLog(seed, character, fps)
+
+    def record(self, keys):
+        ''' Состояние клавиш, с которым выполняется очередной шаг '''
+        if self._log is not None:
+            self._log.masks.append(keys_to_mask(keys))
+
+    def record_event(self, code):
+        ''' Событие, обработанное перед следующим шагом '''
+        if self._log is not None:
+            self._log.events.append((len(self._log.masks), code))
+
+    def save(self):
+        if self._log is not None:
+            self._log.save(self._path)
@@ -0,0 +1,98 @@
+import heapq
+import itertools
+
+def expired(now, start, delay, strict=False):
+    '''
+    Правило истечения срока: now - start >= delay (или > delay при strict).
+    Работает и с числами, и с массивами NumPy, поэтому пакетный EnemyStore
+    и события планировщика считают сроки одинаково
+    '''
+    elapsed = now - start
+    return elapsed > delay if strict else elapsed >= delay
+
+class Timer:
+    ''' Зарегистрированное событие; отменяется через Scheduler.cancel '''
+    __slots__ = ("due", "start", "delay", "strict", "callback")
+
+    def __init__(self, start, delay, strict, callback):
+        self.due = start + delay
+        self.start = start
+        self.delay = delay
+        self.strict = strict
+        self.callback = callback
+
+    @property
+    def active(self):
+        return self.callback is not None
+
+    def expired(self, now):
+        ''' Наступил ли срок (см. expired) '''
+        return expired(now, self.start, self.delay, self.strict)
+
+class Scheduler:
+    '''
+    Отложенные события на игровых часах: объекты регистрируют сроки
+    ("снять вспышку урона через 1 с", "атака готова через 1 с") вместо
+    того, чтобы сравнивать время на каждом шаге. События лежат в куче по
+    сроку, и run_due() снимает с нее только наступившие, поэтому работа за
+    шаг пропорциональна числу сработавших событий, а не числу объектов.
+    Отмененные события удаляются из кучи, когда доходят до ее вершины
+    '''
+    # Срок в куче - сумма с плавающей точкой, а истечение проверяется точным
+    # правилом expired; события со сроком в пределах этого допуска от now
+    # проверяются все, чтобы непросроченное не заслоняло просроченные
+    DUE_TOLERANCE = 1e-9
+
+    def __init__(self):
+        self._heap = []
+        self._sequence = itertools.count()  # Равные сроки срабатывают в порядке регистрации
+        self._active = 0
+
+    def __len__(self):
+        ''' Число ожидающих (не отмененных и не сработавших) событий '''
+        return self._active
+
+    def schedule(self, start, delay, callback, strict=False):
+        '''
+        Вызывает callback() на первом шаге, где now - start >= delay
+        (или > delay при strict). Возвращает Timer для отмены
+        '''
+        timer = Timer(start, delay, strict, callback)
+        heapq.heappush(self._heap, (timer.due, next(self._sequence), timer))
+        self._active += 1
+        return timer
+
+    def cancel(self, timer):
+        ''' Отменяет событие; запись остается в куче до вершины '''
+        if timer.callback is not None:
+            timer.callback = None
+            self._active -= 1
+
+    def run_due(self, now):
+        ''' Выполняет наступившие события в порядке сроков; возвращает их число '''
+        heap = self._heap
+        limit = now + self.DUE_TOLERANCE
+        due = []
+        while heap and heap[0][0] <= limit:
+            entry = heapq.heappop(heap)
+            if entry[2].callback is not None:
+                due.append(entry)
+        fired = 0
+        for entry in due:
+            timer = entry[2]
+            if not timer.expired(now):
+                heapq.heappush(heap, entry)
+            elif timer.callback is not None:  # Могло быть отменено callback-ом раньше в этом шаге
+                callback, timer.callback = timer.callback, None
+                self._active -= 1
+                callback()
+                fired += 1
+        return fired
+
+    def clear(self):
+        ''' Сбрасывает все события (новая игра) '''
+        self._heap.clear()
+        self._active = 0
+
+# Общий планировщик для всех игровых объектов, работает на игровых часах (game_clock.clock)
+scheduler = Scheduler()
@@ -0,0 +1,55 @@
+import pygame
+
+class ScriptedKeys:
+    '''
+    Замена pygame.key.get_pressed() для прогонов без окна:
+    индексируется кодом клавиши и возвращает True для нажатых
+    '''
+    def __init__(self, pressed=()):
+        self._pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self._pressed
+
+    @property
+    def pressed(self):
+        return self._pressed
+
+def idle_script(tick):
+    ''' Игрок стоит на месте и ничего не нажимает '''
+    return ()
+
+def kite_script(tick):
+    ''' Игрок обходит квадрат, меняя сторону каждые две секунды, и постоянно стреляет '''
+    route = [pygame.K_d, pygame.K_s, pygame.K_a, pygame.K_w]
+    return (route[(tick // 60) % len(route)], pygame.K_SPACE)
+
+class EvadeController:
+    '''
+    Простой бот для прогонов без окна: отходит от ближайшего врага, если тот
+    подошел вплотную, иначе выравнивается с ним по вертикали и стреляет в его
+    сторону. Вызывается как input_script(tick) и читает состояние игры
+    '''
+    DANGER_DISTANCE = 200
+    ALIGN_DISTANCE = 40
+
+    def __init__(self, game):
+        self._game = game
+
+    def __call__(self, tick):
+        player = self._game._player
+        enemies = self._game._enemies
+        if not enemies:
+            return ()
+        nearest = min(enemies, key=lambda e: (e._x - player.x) ** 2 + (e._y - player.y) ** 2)
+        dx, dy = nearest._x - player.x, nearest._y - player.y
+        keys = [pygame.K_SPACE]
+        if dx * dx + dy * dy < self.DANGER_DISTANCE ** 2:
+            keys.append(pygame.K_a if dx > 0 else pygame.K_d)
+            keys.append(pygame.K_w if dy > 0 else pygame.K_s)
+        else:
+            # Шаг по горизонтали разворачивает игрока к врагу, снаряды летят в его сторону
+            keys.append(pygame.K_d if dx > 0 else pygame.K_a)
+            if abs(dy) > self.ALIGN_DISTANCE:
+                keys.append(pygame.K_s if dy > 0 else pygame.K_w)
+        return tuple(keys)
@@ -0,0 +1,118 @@
+import random
+
+class SpawnSampler:
+    '''
+    Выбор позиций для появления врагов. Карта один раз делится на клетки,
+    и в список кандидатов попадают только клетки, целиком свободные от
+    препятствий и их охранной зоны. Позиция выбирается случайной клеткой
+    из списка и отбрасывается, только если ее видно с экрана игрока,
+    поэтому ожидаемое число попыток не зависит от числа препятствий.
+    Позиции берутся из кольца шириной ring_width за краем экрана; по
+    умолчанию ширина кольца - RING_FRACTION меньшей стороны экрана
+    '''
+    MAX_ATTEMPTS = 16
+    RING_FRACTION = 0.5
+
+    def __init__(self, map_width, map_height, obstacles, view_size, agent_size=75,
+                 safe_distance=150, cell_size=25, ring_width=None, rng=random):
+        self._cell_size = cell_size
+        self._max_x = map_width - agent_size
+        self._max_y = map_height - agent_size
+        self._cols = self._max_x // cell_size + 1
+        self._rows = self._max_y // cell_size + 1
+        self._half_width = view_size[0] // 2
+        self._half_height = view_size[1] // 2
+        self._ring_width = self.ring_width_for(view_size) if ring_width is None else ring_width
+        self._rng = rng
+        self._free = self._build_mask(obstacles, safe_distance)
+        self._candidates = [index for index, free in enumerate(self._free) if free]
+
+    def __len__(self):
+        return len(self._candidates)
+
+    @property
+    def ring_width(self):
+        return self._ring_width
+
+    @classmethod
+    def ring_width_for(cls, view_size):
+        ''' Ширина кольца появления для экрана view_size '''
+        return int(min(view_size) * cls.RING_FRACTION)
+
+    def _cell_bounds(self, col, row):
+        ''' Крайние допустимые координаты (x0, y0, x1, y1) внутри клетки '''
+        size = self._cell_size
+        return (col * size, row * size,
+                min(self._max_x, (col + 1) * size - 1), min(self._max_y, (row + 1) * size - 1))
+
+    def _build_mask(self, obstacles, safe_distance):
+        ''' Сетка клеток, в любой точке которых враг может появиться '''
+        free = [True] * (self._cols * self._rows)
+        for obstacle in obstacles:
+            rect = obstacle.rect
+            # Запрещено: точка внутри препятствия или ближе safe_distance к его центру по обеим осям
+            boxes = ((rect.left, rect.top, rect.right, rect.bottom),
+                     (rect.centerx - safe_distance + 1, rect.centery - safe_distance + 1,
+                      rect.centerx + safe_distance, rect.centery + safe_distance))
+            for left, top, right, bottom in boxes:
+                col0 = max(0, left // self._cell_size)
+                col1 = min(self._cols - 1, (right - 1) // self._cell_size)
+                row0 = max(0, top // self._cell_size)
+                row1 = min(self._rows - 1, (bottom - 1) // self._cell_size)
+                for row in range(row0, row1 + 1):
+                    for col in range(col0, col1 + 1):
+                        free[row * self._cols + col] = False
+        return free
+
+    def _random_point(self, index):
+        ''' Случайная точка внутри клетки '''
+        row, col = divmod(index, self._cols)
+        x0, y0, x1, y1 = self._cell_bounds(col, row)
+        return self._rng.randint(x0, x1), self._rng.randint(y0, y1)
+
+    def _is_visible(self, x, y, player_x, player_y):
+        ''' Попадает ли точка в экран вокруг игрока '''
+        return abs(x - player_x) <= self._half_width and abs(y - player_y) <= self._half_height
+
+    def _draw_candidate(self, player_x, player_y):
+        ''' Одна попытка: случайная точка кольца вокруг экрана, None, если она занята '''
+        reach_x = self._half_width + self._ring_width
+        reach_y = self._half_height + self._ring_width
+        x = self._rng.randint(max(0, player_x - reach_x), min(self._max_x, player_x + reach_x))
+        y = self._rng.randint(max(0, player_y - reach_y), min(self._max_y, player_y + reach_y))
+        if not self._free[(y // self._cell_size) * self._cols + x // self._cell_size]:
+            return None
+        return x, y
+
+    def _fallback(self, player_x, player_y):
+        ''' Почти вся доступная область на экране: перебор клеток целиком вне экрана '''
+        hidden = []
+        for index in self._candidates:
+            row, col = divmod(index, self._cols)
+            x0, y0, x1, y1 = self._cell_bounds(col, row)
+            if (x1 < player_x - self._half_width or x0 > player_x + self._half_width or
+                    y1 < player_y - self._half_height or y0 > player_y + self._half_height):
+                hidden.append(index)
+        if not hidden:
+            return None
+        return self._random_point(self._rng.choice(hidden))
+
+    def sample(self, player_x, player_y):
+        ''' Позиция (x, y) вне экрана игрока или None, если свободного места нет '''
+        if not self._candidates:
+            return None
+        for _ in range(self.MAX_ATTEMPTS):
+            point = self._draw_candidate(player_x, player_y)
+            if point is not None and not self._is_visible(point[0], point[1], player_x, player_y):
+                return point
+        return self._fallback(player_x, player_y)
+
+    def sample_many(self, count, player_x, player_y):
+        ''' Позиции для пакетного появления нескольких врагов '''
+        points = []
+        for _ in range(count):
+            point = self.sample(player_x, player_y)
+            if point is None:
+                break
+            points.append(point)
+        return points
@@ -0,0 +1,80 @@
+import pygame
+
+def sprite_key(path, size, flip=False):
+    ''' Ключ спрайта в пакете ресурсов '''
+    return f"{path}|{size[0]}x{size[1]}|{'flip' if flip else 'plain'}"
+
+class SpriteCache:
+    '''
+    Общий для всего процесса кэш спрайтов с ключом (путь, размер, отражение).
+    Если подключен пакет ресурсов, готовые спрайты берутся из него без
+    декодирования и масштабирования
+    '''
+    _images = {}
+    _frames = {}
+    _pack = None
+    _generation = 0  # Растет при каждой очистке; по нему таблицы кадров узнают, что кэш сброшен
+
+    @classmethod
+    def use_pack(cls, pack):
+        ''' Подключает пакет ресурсов (AssetPack) или отключает его (None) '''
+        cls._pack = pack
+        cls.clear()
+
+    @classmethod
+    def packed(cls, key):
+        ''' Поверхность из пакета ресурсов или None, если пакета или ключа нет '''
+        if cls._pack is None:
+            return None
+        return cls._pack.surface(key)
+
+    @classmethod
+    def get(cls, path, size, flip=False):
+        ''' Возвращает масштабированное (и при необходимости отраженное) изображение '''
+        key = (path, size, flip)
+        image = cls._images.get(key)
+        if image is None:
+            image = cls.packed(sprite_key(path, size, flip))
+            if image is not None:
+                image = cls._convert(image)
+            elif flip:
+                image = pygame.transform.flip(cls.get(path, size), True, False)
+            else:
+                image = cls._convert(pygame.transform.scale(pygame.image.load(path), size))
+            cls._images[key] = image
+        return image
+
+    @classmethod
+    def frames(cls, paths, size, flip=False):
+        ''' Возвращает кадры анимации; повторный вызов сводится к поиску в словаре '''
+        key = (tuple(paths), size, flip)
+        frames = cls._frames.get(key)
+        if frames is None:
+            frames = tuple(cls.get(path, size, flip) for path in key[0])
+            cls._frames[key] = frames
+        return frames
+
+    @classmethod
+    def clear(cls):
+        ''' Очищает кэш (например, после смены режима экрана) '''
+        cls._images.clear()
+        cls._frames.clear()
+        cls._generation += 1
+
+    @classmethod
+    def generation(cls):
+        return cls._generation
+
+    @classmethod
+    def images(cls):
+        ''' Все загруженные изображения по ключу (путь, размер, отражение) '''
+        return cls._images
+
+    @staticmethod
+    def _convert(image):
+        ''' Переводит изображение в формат экрана, если окно уже создано '''
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            if image.get_flags() & pygame.SRCALPHA:
+                return image.convert_alpha()
+            return image.convert()
+        return image
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Модули игры лежат в корне репозитория; окно и звук в тестах не нужны
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
@@ -0,0 +1,80 @@
+import pytest
+
+from replay import InputLog, RECORDED_KEYS, EVENT_PAUSE, EVENT_TOGGLE_OVERLAY, keys_to_mask, mask_to_keys
+
+ALL_KEYS = (1 << len(RECORDED_KEYS)) - 1
+
+def _round_trip(log):
+    restored = InputLog.from_bytes(log.to_bytes())
+    assert (restored.seed, restored.character, restored.fps) == (log.seed, log.character, log.fps)
+    assert restored.masks == log.masks
+    assert restored.events == log.events
+    return restored
+
+def test_empty_log_round_trip():
+    _round_trip(InputLog(0, "Punk", 30))
+
+def test_long_runs_round_trip_compactly():
+    # Длины серий больше 127 и 16383 занимают два и три байта varint
+    masks = [0] * 100_000 + [ALL_KEYS] * 200 + [1] + [0] * 20_000
+    log = InputLog(2 ** 40, "Cyborg", 30, masks)
+    _round_trip(log)
+    assert len(log.to_bytes()) < 64
+
+def test_alternating_masks_round_trip():
+    masks = [tick % (ALL_KEYS + 1) for tick in range(1000)]
+    _round_trip(InputLog(7, "Punk", 60, masks))
+
+def test_events_round_trip_including_tick_zero():
+    events = [(0, EVENT_TOGGLE_OVERLAY), (0, EVENT_PAUSE), (1, EVENT_TOGGLE_OVERLAY),
+              (1, EVENT_TOGGLE_OVERLAY), (500, EVENT_PAUSE), (70_000, EVENT_TOGGLE_OVERLAY)]
+    log = _round_trip(InputLog(3, "Cyborg", 30, [0] * 70_001, events))
+    assert log.events_at(0) == [EVENT_TOGGLE_OVERLAY, EVENT_PAUSE]
+    assert log.events_at(2) == []
+
+def test_masks_map_back_to_keys():
+    for mask in range(ALL_KEYS + 1):
+        assert keys_to_mask(mask_to_keys(mask)) == mask
+
+def test_unknown_format_is_rejected():
+    data = bytearray(InputLog(0, "Punk", 30).to_bytes())
+    data[0:4] = b"XXXX"
+    with pytest.raises(ValueError):
+        InputLog.from_bytes(bytes(data))
+
+@pytest.fixture(scope="module")
+def recorded_run(tmp_path_factory):
+    ''' Короткая записанная игра: файл записи и след state_digest по шагам '''
+    from main import Game
+    from simulation import kite_script
+    path = tmp_path_factory.mktemp("replay") / "run.bin"
+    game = Game(headless=True, character="Punk", seed=1234, record=str(path))
+    trace = []
+    game.simulate(10, kite_script, trace)
+    return InputLog.load(str(path)), trace
+
+def _replay(log, vectorized=False):
+    from main import Game
+    game = Game(headless=True, character=log.character, seed=log.seed, vectorized=vectorized)
+    trace = []
+    game.replay(log, trace)
+    return trace
+
+def test_replay_repeats_recorded_run(recorded_run):
+    log, recorded = recorded_run
+    assert len(log) == len(recorded) == 300
+    first = _replay(log)
+    second = _replay(log)
+    assert first == second == recorded
+
+def test_replay_with_overlay_events_is_unchanged(recorded_run):
+    log, recorded = recorded_run
+    log = InputLog(log.seed, log.character, log.fps, log.masks, [(0, EVENT_TOGGLE_OVERLAY), (100, EVENT_TOGGLE_OVERLAY)])
+    assert _replay(log) == recorded
+
+def test_vectorized_replay_matches_scalar(recorded_run):
+    from enemy_store import EnemyStore
+    if not EnemyStore.is_available():
+        pytest.skip("NumPy не установлен")
+    log, recorded = recorded_run
+    assert _replay(log, vectorized=True) == recorded
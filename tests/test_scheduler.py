@@ -0,0 +1,66 @@
+import pytest
+
+from game_clock import GameClock
+from scheduler import Scheduler, expired
+
+HURT = 1.0
+ATTACK = 1.0
+
+def _fire_ticks(step, hurt_first, start_tick):
+    ''' Номера шагов, на которых сработали вспышка урона (strict) и готовность атаки '''
+    clock = GameClock(step=step)
+    scheduler = Scheduler()
+    for _ in range(start_tick):
+        clock.advance()
+    start = clock.time
+    fired = {}
+    timers = [
+        ("hurt", lambda: scheduler.schedule(start, HURT, lambda: fired.setdefault("hurt", clock.ticks), strict=True)),
+        ("attack", lambda: scheduler.schedule(start, ATTACK, lambda: fired.setdefault("attack", clock.ticks))),
+    ]
+    for _, schedule in (timers if hurt_first else reversed(timers)):
+        schedule()
+    expected = {}
+    while len(fired) < 2 and clock.ticks < start_tick + 100:
+        clock.advance()
+        scheduler.run_due(clock.time)
+        if "hurt" not in expected and expired(clock.time, start, HURT, strict=True):
+            expected["hurt"] = clock.ticks
+        if "attack" not in expected and expired(clock.time, start, ATTACK):
+            expected["attack"] = clock.ticks
+    return fired, expected, len(scheduler)
+
+# При шаге 1/32 время складывается точно, и строгий срок вспышки наступает
+# на шаг позже нестрогого срока атаки при том же сроке в куче
+@pytest.mark.parametrize("step", [1 / 30, 1 / 32])
+@pytest.mark.parametrize("hurt_first", [True, False])
+@pytest.mark.parametrize("start_tick", range(0, 60, 7))
+def test_timers_with_same_due_time_fire_on_their_own_ticks(step, hurt_first, start_tick):
+    fired, expected, pending = _fire_ticks(step, hurt_first, start_tick)
+    assert fired == expected
+    if step == 1 / 32:
+        assert fired["hurt"] == fired["attack"] + 1
+    assert pending == 0
+
+def test_pending_strict_timer_does_not_hide_expired_timer():
+    scheduler = Scheduler()
+    fired = []
+    scheduler.schedule(0.0, 1.0, lambda: fired.append("hurt"), strict=True)
+    scheduler.schedule(0.0, 1.0, lambda: fired.append("attack"))
+    assert scheduler.run_due(1.0) == 1
+    assert fired == ["attack"]
+    assert len(scheduler) == 1
+    assert scheduler.run_due(1.0 + 1 / 30) == 1
+    assert fired == ["attack", "hurt"]
+    assert len(scheduler) == 0
+
+def test_cancelled_timers_are_not_counted_or_fired():
+    scheduler = Scheduler()
+    fired = []
+    timer = scheduler.schedule(0.0, 1.0, lambda: fired.append("hurt"))
+    scheduler.schedule(0.0, 2.0, lambda: fired.append("attack"))
+    scheduler.cancel(timer)
+    assert len(scheduler) == 1
+    scheduler.run_due(5.0)
+    assert fired == ["attack"]
+    assert len(scheduler) == 0